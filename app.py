@@ -0,0 +1,651 @@
+import math
+import sys
+import tkinter as tk
+import tkinter.font
+from tkinter import filedialog, messagebox
+
+import metrics
+import profiling
+from core import Calculator, format_result, parse_input, validate_numeric_input
+from input_buffer import ExpressionBuffer
+from worker import EvaluationWorker
+
+class CalculatorGUI:
+    POLL_MS = 20
+    
+    def __init__(self, parent, calculator, utils, time_budget=5.0, preview=True):
+        self.root = parent
+        self.calculator = calculator
+        self.utils = utils
+        self.buffer = ExpressionBuffer()
+        self.display_var = tk.StringVar(value="0")
+        self.preview_var = tk.StringVar(value="")
+        self.preview_enabled = preview
+        self._preview_job = None
+        self.worker = EvaluationWorker(time_budget)
+        self.worker.start()
+        self._on_result = None
+        self._poll_job = None
+        self.setup_ui()
+        self.setup_keyboard_bindings()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+    
+    @property
+    def expression(self):
+        return self.buffer.text
+    
+    @expression.setter
+    def expression(self, text):
+        self.buffer.set_text(text)
+    
+    @property
+    def decimal_added(self):
+        return self.buffer.decimal_added
+    
+    def close(self):
+        if self._preview_job is not None:
+            self.root.after_cancel(self._preview_job)
+        self.worker.close()
+        self.root.destroy()
+    
+    def setup_ui(self):
+        self.root.title("Scientific Calculator")
+        self.root.geometry("320x450")
+        self.root.resizable(False, False)
+        self.root.configure(bg="#f0f0f0")
+        
+        self.root.update_idletasks()
+        width = self.root.winfo_width()
+        height = self.root.winfo_height()
+        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        self.root.geometry(f'{width}x{height}+{x}+{y}')
+        
+        display_frame = tk.Frame(self.root, bg="#f0f0f0")
+        display_frame.grid(row=0, column=0, columnspan=5, padx=5, pady=10, sticky="ew")
+        self.display = tk.Entry(display_frame, textvariable=self.display_var, 
+                               font=("Arial", 16, "bold"), justify="right", 
+                               state="readonly", bg="white", fg="black",
+                               relief="solid", borderwidth=2,
+                               insertwidth=0)
+        self.display.pack(fill=tk.X)
+        self.preview_label = tk.Label(display_frame, textvariable=self.preview_var,
+                                      font=("Arial", 11), anchor="e", bg="#f0f0f0", fg="#707070")
+        if self.preview_enabled:
+            self.preview_label.pack(fill=tk.X)
+        
+        button_configs = {
+            'normal': {'bg': '#e0e0e0', 'fg': 'black', 'activebackground': '#d0d0d0'},
+            'operator': {'bg': '#ff9500', 'fg': 'white', 'activebackground': '#e68900'},
+            'function': {'bg': '#a6a6a6', 'fg': 'white', 'activebackground': '#8c8c8c'},
+            'zero': {'bg': '#f0f0f0', 'fg': 'black', 'activebackground': '#e0e0e0'},
+            'equals': {'bg': '#ff9500', 'fg': 'white', 'activebackground': '#e68900', 'font': ("Arial", 14, "bold")}
+        }
+        
+        buttons = [
+            ('MC', 1, 0, 'function'), ('MR', 1, 1, 'function'), ('M+', 1, 2, 'function'), ('M-', 1, 3, 'function'), ('C', 1, 4, 'function'),
+            ('±', 2, 0, 'normal'), ('√', 2, 1, 'function'), ('%', 2, 2, 'normal'), ('÷', 2, 3, 'operator'), ('×', 2, 4, 'operator'),
+            ('7', 3, 0, 'normal'), ('8', 3, 1, 'normal'), ('9', 3, 2, 'normal'), ('-', 3, 3, 'operator'), ('+', 3, 4, 'operator'),
+            ('4', 4, 0, 'normal'), ('5', 4, 1, 'normal'), ('6', 4, 2, 'normal'), 
+            ('1', 5, 0, 'normal'), ('2', 5, 1, 'normal'), ('3', 5, 2, 'normal'), 
+            ('0', 6, 0, 'zero'), ('.', 6, 2, 'normal')
+        ]
+        
+        for text, row, col, btn_type in buttons:
+            if text == '0':
+                btn = tk.Button(self.root, text=text, font=("Arial", 14),
+                               command=lambda t=text: self.button_click(t),
+                               **button_configs[btn_type], width=10, height=2)
+                btn.grid(row=row, column=col, columnspan=2, padx=2, pady=2, sticky="nsew")
+            else:
+                config = button_configs[btn_type].copy()
+                if btn_type == 'equals':
+                    config['font'] = ("Arial", 14, "bold")
+                btn = tk.Button(self.root, text=text, font=("Arial", 14),
+                               command=lambda t=text: self.button_click(t),
+                               **config, width=6, height=2)
+                btn.grid(row=row, column=col, padx=2, pady=2, sticky="nsew")
+        
+        equals_btn = tk.Button(self.root, text='=', font=("Arial", 14, "bold"),
+                              command=lambda: self.button_click('='),
+                              bg="#ff9500", fg="white", activebackground="#e68900",
+                              width=6, height=3)
+        equals_btn.grid(row=4, column=3, rowspan=3, columnspan=2, padx=2, pady=2, sticky="nsew")
+        
+        for i in range(7):
+            self.root.grid_rowconfigure(i, weight=1)
+        for i in range(5):
+            self.root.grid_columnconfigure(i, weight=1)
+    
+    def setup_keyboard_bindings(self):
+        self.root.bind('<Key>', self.on_key_press)
+        self.root.focus_set()
+    
+    def on_key_press(self, event):
+        key = event.char
+        if key.isdigit():
+            self.button_click(key)
+        elif key in ['+', '-', '*', '/', '.']:
+            op_map = {'*': '×', '/': '÷'}
+            self.button_click(op_map.get(key, key))
+        elif event.keysym in ['Return', 'KP_Enter']:
+            self.button_click('=')
+        elif key.lower() == 'c' or event.keysym == 'Escape':
+            self.button_click('C')
+        elif event.keysym == 'BackSpace':
+            self.button_click('⌫')
+    
+    def button_click(self, char):
+        if self.worker.busy:
+            # while a calculation runs, C / Escape cancels it and other keys are ignored
+            if char == 'C':
+                self.cancel_calculation()
+            return
+        try:
+            if char == 'C':
+                self.clear_all()
+            elif char == '⌫':
+                self.backspace()
+            elif char == 'MC':
+                self.calculator.memory_clear()
+                self.display_var.set("0")
+                self.buffer.clear()
+            elif char == 'MR':
+                result = self.calculator.memory_recall()
+                if self.expression == "0" or self.expression == "":
+                    self.buffer.set_text(result)
+                else:
+                    self.buffer.append_text(result)
+                self.display_var.set(self.expression)
+            elif char == 'M+':
+                self.start_evaluation(self.expression,
+                                      lambda val: self.update_memory(self.calculator.memory_add, val))
+            elif char == 'M-':
+                self.start_evaluation(self.expression,
+                                      lambda val: self.update_memory(self.calculator.memory_subtract, val))
+            elif char == '±':
+                if self.buffer.toggle_sign():
+                    self.display_var.set(self.expression)
+            elif char == '%':
+                self.apply_percentage()
+            elif char == '√':
+                self.apply_square_root()
+            elif char in ['÷', '×', '+', '-']:
+                self.buffer.push_operator(char)
+                self.display_var.set(self.expression)
+            elif char == '.':
+                if self.buffer.push_decimal():
+                    self.display_var.set(self.expression)
+            elif char.isdigit():
+                self.buffer.push_digit(char)
+                self.display_var.set(self.expression)
+            elif char == '=':
+                self.perform_calculation()
+        except Exception as e:
+            self.utils['show_error_message'](self.root, f"Error: {str(e)}")
+            self.clear_all()
+        self.schedule_preview()
+    
+    def set_preview(self, enabled):
+        self.preview_enabled = enabled
+        if enabled:
+            self.preview_label.pack(fill=tk.X)
+            self.schedule_preview()
+        else:
+            self.preview_label.pack_forget()
+    
+    def schedule_preview(self):
+        # a burst of keystrokes is folded into one update once the event queue drains
+        if self.preview_enabled and self._preview_job is None:
+            self._preview_job = self.root.after_idle(self.update_preview)
+    
+    def update_preview(self):
+        self._preview_job = None
+        value = self.buffer.preview() if len(self.buffer) > 1 else None
+        try:
+            text = "" if value is None else f"= {self.calculator._format_number(value)}"
+        except (OverflowError, ValueError):
+            text = ""
+        self.preview_var.set(text)
+    
+    def clear_all(self):
+        self.buffer.clear()
+        self.display_var.set("0")
+    
+    def backspace(self):
+        self.buffer.backspace()
+        self.display_var.set(self.expression or "0")
+    
+    def toggle_sign_in_expression(self):
+        if self.buffer.toggle_sign():
+            self.display_var.set(self.expression)
+    
+    def apply_percentage(self):
+        # Apply percentage to the last number in expression
+        try:
+            if self.buffer.map_last_number(lambda val: self.calculator._format_number(val / 100)):
+                self.display_var.set(self.expression)
+        except ValueError:
+            pass
+    
+    def apply_square_root(self):
+        # Apply sqrt to the last number in expression
+        def square_root(val):
+            if val < 0:
+                raise ValueError("Cannot calculate square root of negative number")
+            return self.calculator._format_number(math.sqrt(val))
+        try:
+            if self.buffer.map_last_number(square_root):
+                self.display_var.set(self.expression)
+        except ValueError as e:
+            self.utils['show_error_message'](self.root, str(e))
+    
+    def evaluate_expression(self, expr):
+        cleaned = self.calculator._clean_expression(expr)
+        try:
+            result = self.calculator.engine.evaluate(cleaned)
+            if isinstance(result, (int, float)):
+                return result
+            return None
+        except:
+            return None
+    
+    def start_evaluation(self, expr, on_result):
+        if not expr:
+            return
+        if expr == self.expression:
+            # the buffer already holds the tokens, so the worker skips lexing
+            try:
+                job = self.buffer.template()
+            except ValueError:
+                job = self.calculator._clean_expression(expr)
+        else:
+            job = self.calculator._clean_expression(expr)
+        self.worker.submit(job)
+        self._on_result = on_result
+        self.display_var.set("computing…")
+        self._poll_job = self.root.after(self.POLL_MS, self.poll_evaluation)
+    
+    def poll_evaluation(self):
+        reply = self.worker.poll()
+        if reply is None:
+            self._poll_job = self.root.after(self.POLL_MS, self.poll_evaluation)
+            return
+        self._poll_job = None
+        on_result, self._on_result = self._on_result, None
+        self.display_var.set(self.expression or "0")
+        status, value = reply
+        if status == "ok" and isinstance(value, (int, float)):
+            try:
+                on_result(value)
+            except Exception as e:
+                self.utils['show_error_message'](self.root, f"Calculation error: {str(e)}")
+                self.clear_all()
+        elif status == "timeout":
+            self.utils['show_error_message'](self.root, value)
+        else:
+            self.utils['show_error_message'](self.root, "Error in calculation")
+    
+    def cancel_calculation(self):
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._on_result = None
+        self.worker.cancel()
+        self.display_var.set(self.expression or "0")
+    
+    def update_memory(self, apply, value):
+        apply(value)
+        self.display_var.set(f"M={self.calculator.memory_recall()}")
+        self.root.after(1000, lambda: self.display_var.set(self.expression))
+    
+    def perform_calculation(self):
+        if not self.buffer.complete:
+            self.utils['show_error_message'](self.root, "Incomplete expression")
+            return
+        self.start_evaluation(self.expression, self.finish_calculation)
+    
+    def finish_calculation(self, result):
+        formatted = self.calculator._format_number(result)
+        self.calculator.history.add(self.expression, formatted)
+        self.expression = formatted
+        self.display_var.set(formatted)
+        self.schedule_preview()
+
+def show_error_message(parent, message):
+    try:
+        messagebox.showerror("Calculator Error", message, parent=parent)
+    except:
+        print(f"Error: {message}")
+
+def clear_inputs(parent):
+    pass
+
+def update_history(history_listbox, history):
+    if history_listbox:
+        history_listbox.delete(0, tk.END)
+        for item in history[-20:]:
+            history_listbox.insert(tk.END, item)
+
+class HistoryView:
+    SEARCH_CHUNK = 5000
+    POLL_MS = 250
+    
+    def __init__(self, parent, history, rows=20):
+        self.history = history
+        self.rows = rows
+        self.top = 0
+        self.follow = True
+        self.matches = None
+        self.search_text = ""
+        self._scan_seq = 0
+        self._scan_job = None
+        self._poll_job = None
+        self._line_height = None
+        self._seen = (history.first_seq, history.next_seq)
+        
+        self.frame = tk.Frame(parent)
+        self.frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        
+        search_frame = tk.Frame(self.frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        tk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        tk.Entry(search_frame, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_var.trace_add("write", lambda *args: self.set_search(self.search_var.get()))
+        self.status_var = tk.StringVar()
+        tk.Label(search_frame, textvariable=self.status_var, width=14, anchor="e").pack(side=tk.LEFT)
+        
+        self.scrollbar = tk.Scrollbar(self.frame, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox = tk.Listbox(self.frame, font=("Arial", 10), height=rows, activestyle="none")
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.listbox.bind("<Configure>", self.on_resize)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_by(-1))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_by(1))
+        self.listbox.bind("<Destroy>", self.on_destroy)
+        
+        self.render()
+        self._poll_job = self.listbox.after(self.POLL_MS, self.poll)
+    
+    def total(self):
+        if self.matches is not None:
+            return len(self.matches)
+        return len(self.history)
+    
+    def row_text(self, index):
+        if self.matches is not None:
+            return self.history.get(self.matches[index]) or ""
+        return self.history[index]
+    
+    def max_top(self):
+        return max(0, self.total() - self.rows)
+    
+    def render(self):
+        total = self.total()
+        if self.follow:
+            self.top = self.max_top()
+        self.top = min(self.top, self.max_top())
+        stop = min(total, self.top + self.rows)
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *[self.row_text(i) for i in range(self.top, stop)])
+        self.update_scrollbar()
+    
+    def update_scrollbar(self):
+        total = self.total()
+        if total <= self.rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + self.rows) / total)
+        if self.matches is not None:
+            suffix = "" if self._scan_job is None else "…"
+            self.status_var.set(f"{total} found{suffix}")
+        else:
+            self.status_var.set(f"{total} items")
+    
+    def scroll_to(self, top):
+        self.top = max(0, min(int(top), self.max_top()))
+        self.follow = self.top >= self.max_top()
+        self.render()
+    
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+        return "break"
+    
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.total())
+        elif unit == "pages":
+            self.scroll_by(int(amount) * self.rows)
+        else:
+            self.scroll_by(int(amount))
+    
+    def on_resize(self, event):
+        if self._line_height is None:
+            font = tk.font.Font(font=self.listbox.cget("font"))
+            self._line_height = max(1, font.metrics("linespace") + 1)
+        rows = max(1, event.height // self._line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.render()
+    
+    def poll(self):
+        self.check()
+        self._poll_job = self.listbox.after(self.POLL_MS, self.poll)
+    
+    def check(self):
+        first_seq, next_seq = self.history.first_seq, self.history.next_seq
+        seen_first, seen_next = self._seen
+        if (first_seq, next_seq) != self._seen:
+            self._seen = (first_seq, next_seq)
+            if first_seq > seen_next or next_seq < seen_next:
+                self.set_search(self.search_text, force=True)
+            elif self.matches is not None:
+                if self._scan_job is None:
+                    self.scan_matches(self._scan_seq, next_seq)
+                self.prune_matches()
+                self.render()
+            elif self.follow and next_seq - seen_next < self.rows and first_seq == seen_first:
+                self.append_rows(next_seq - seen_next)
+            else:
+                self.render()
+    
+    def append_rows(self, count):
+        # new calculations scroll in at the bottom without redrawing the visible rows
+        total = self.total()
+        self.listbox.insert(tk.END, *[self.row_text(i) for i in range(total - count, total)])
+        overflow = self.listbox.size() - self.rows
+        if overflow > 0:
+            self.listbox.delete(0, overflow - 1)
+        self.top = self.max_top()
+        self.update_scrollbar()
+    
+    def set_search(self, text, force=False):
+        if text == self.search_text and not force:
+            return
+        self.search_text = text
+        if self._scan_job is not None:
+            self.listbox.after_cancel(self._scan_job)
+            self._scan_job = None
+        self.follow = True
+        if not text:
+            self.matches = None
+            self.render()
+            return
+        self.matches = []
+        self._scan_seq = self.history.first_seq
+        self.scan_step()
+    
+    def scan_matches(self, start, stop):
+        text = self.search_text
+        get = self.history.get
+        for seq in range(start, stop):
+            entry = get(seq)
+            if entry is not None and text in entry:
+                self.matches.append(seq)
+        self._scan_seq = stop
+    
+    def scan_step(self):
+        # search in slices so typing stays responsive on very large histories
+        stop = min(self.history.next_seq, self._scan_seq + self.SEARCH_CHUNK)
+        self.scan_matches(max(self._scan_seq, self.history.first_seq), stop)
+        if self._scan_seq < self.history.next_seq:
+            self._scan_job = self.listbox.after_idle(self.scan_step)
+        else:
+            self._scan_job = None
+        self.render()
+    
+    def prune_matches(self):
+        first_seq = self.history.first_seq
+        if self.matches and self.matches[0] < first_seq:
+            self.matches = [seq for seq in self.matches if seq >= first_seq]
+    
+    def on_destroy(self, event):
+        for job in (self._poll_job, self._scan_job):
+            if job is not None:
+                self.listbox.after_cancel(job)
+        self._poll_job = self._scan_job = None
+
+def show_history_window(calculator_gui):
+    history_window = tk.Toplevel(calculator_gui.root)
+    history_window.title("Calculation History")
+    history_window.geometry("500x400")
+    history_window.resizable(True, True)
+    
+    view = HistoryView(history_window, calculator_gui.calculator.history)
+    
+    button_frame = tk.Frame(history_window)
+    button_frame.pack(pady=10)
+    
+    clear_btn = tk.Button(button_frame, text="Clear History", 
+                         command=lambda: clear_calculator_history(calculator_gui, view))
+    clear_btn.pack(side=tk.LEFT, padx=5)
+    
+    close_btn = tk.Button(button_frame, text="Close", 
+                         command=history_window.destroy)
+    close_btn.pack(side=tk.LEFT, padx=5)
+
+def format_stats(snapshot):
+    lines = [f"{'operation':10} {'path':18} {'calls':>8} {'mean us':>10} {'p50 us':>9} {'p99 us':>9}"]
+    for entry in snapshot["operations"]:
+        p50 = "-" if entry["p50_ns"] is None else f"{entry['p50_ns'] / 1e3:.1f}"
+        p99 = "-" if entry["p99_ns"] is None else f"{entry['p99_ns'] / 1e3:.1f}"
+        lines.append(f"{entry['operation']:10} {entry['path']:18} {entry['calls']:>8} "
+                     f"{entry['mean_ns'] / 1e3:>10.1f} {p50:>9} {p99:>9}")
+    if snapshot["errors"]:
+        lines.append("")
+        lines.append(f"{'operation':10} {'error':30} {'count':>8}")
+        for entry in snapshot["errors"]:
+            lines.append(f"{entry['operation']:10} {entry['error']:30} {entry['count']:>8}")
+    return "\n".join(lines)
+
+def show_stats_window(calculator_gui, refresh_ms=1000):
+    stats_window = tk.Toplevel(calculator_gui.root)
+    stats_window.title("Stats")
+    stats_window.geometry("640x360")
+    
+    text = tk.Text(stats_window, font=('Courier', 10), wrap=tk.NONE)
+    text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+    enabled_var = tk.BooleanVar(value=metrics.REGISTRY.enabled)
+    job = None
+    
+    def refresh():
+        nonlocal job
+        text.config(state=tk.NORMAL)
+        text.delete("1.0", tk.END)
+        text.insert(tk.END, format_stats(metrics.REGISTRY.snapshot()))
+        text.config(state=tk.DISABLED)
+        job = stats_window.after(refresh_ms, refresh)
+    
+    def toggle():
+        if enabled_var.get():
+            metrics.REGISTRY.enable()
+        else:
+            metrics.REGISTRY.disable()
+    
+    def reset():
+        metrics.REGISTRY.reset()
+        stats_window.after_cancel(job)
+        refresh()
+    
+    def on_destroy(event):
+        if event.widget is stats_window and job is not None:
+            stats_window.after_cancel(job)
+    
+    button_frame = tk.Frame(stats_window)
+    button_frame.pack(pady=10)
+    tk.Checkbutton(button_frame, text="Enabled", variable=enabled_var,
+                   command=toggle).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Reset", command=reset).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Close", command=stats_window.destroy).pack(side=tk.LEFT, padx=5)
+    stats_window.bind("<Destroy>", on_destroy)
+    refresh()
+
+def build_profile_menu(menubar, root):
+    # profiles the GUI process only; evaluations run in the EvaluationWorker process,
+    # so they show up as waiting on the worker rather than as tagged evaluation samples
+    profile_menu = tk.Menu(menubar, tearoff=0)
+    menubar.add_cascade(label="Profile", menu=profile_menu)
+    
+    def update_menu():
+        running = profiling.PROFILER.active
+        for label in ("Start cProfile", "Start Sampling"):
+            profile_menu.entryconfig(label, state=tk.DISABLED if running else tk.NORMAL)
+        profile_menu.entryconfig("Stop and Save...", state=tk.NORMAL if running else tk.DISABLED)
+    
+    def start(mode):
+        profiling.PROFILER.start(mode)
+        update_menu()
+    
+    def stop():
+        extension = ".pstats" if profiling.PROFILER.mode == "cprofile" else ".collapsed"
+        path = filedialog.asksaveasfilename(parent=root, defaultextension=extension,
+                                            initialfile="calculator" + extension)
+        if not path:
+            return
+        try:
+            profiling.stop_and_write(path)
+        except OSError as e:
+            show_error_message(root, f"Could not save profile: {e}")
+        update_menu()
+    
+    profile_menu.add_command(label="Start cProfile", command=lambda: start("cprofile"))
+    profile_menu.add_command(label="Start Sampling", command=lambda: start("sample"))
+    profile_menu.add_command(label="Stop and Save...", command=stop)
+    update_menu()
+    return profile_menu
+
+def clear_calculator_history(calculator_gui, view):
+    calculator_gui.calculator.history.clear()
+    view.check()
+
+def run(args):
+    try:
+        root = tk.Tk()
+        calculator = Calculator()
+        utils = {
+            'validate_numeric_input': validate_numeric_input,
+            'format_result': format_result,
+            'parse_input': parse_input,
+            'show_error_message': show_error_message,
+            'clear_inputs': clear_inputs,
+            'update_history': update_history
+        }
+        menubar = tk.Menu(root)
+        root.config(menu=menubar)
+        view_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="View", menu=view_menu)
+        view_menu.add_command(label="Show History", 
+                             command=lambda: show_history_window(app))
+        view_menu.add_command(label="Stats", command=lambda: show_stats_window(app))
+        build_profile_menu(menubar, root)
+        preview_var = tk.BooleanVar(value=not args.no_preview)
+        view_menu.add_checkbutton(label="Live Preview", variable=preview_var,
+                                  command=lambda: app.set_preview(preview_var.get()))
+        app = CalculatorGUI(root, calculator, utils, time_budget=args.time_budget,
+                            preview=preview_var.get())
+        root.mainloop()
+    except Exception as e:
+        print(f"Application Error: {e}", file=sys.stderr)
+        sys.exit(1)
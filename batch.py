@@ -0,0 +1,103 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+_worker_calculator = None
+
+def read_expressions(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+def evaluate_expressions(calculator, expressions):
+    calculate = calculator.calculate
+    for expression in expressions:
+        try:
+            yield calculate(expression)
+        except ValueError as e:
+            yield f"Error: {e}"
+
+def write_results(results, out, buffer_lines=4096):
+    count = 0
+    buffer = []
+    for result in results:
+        buffer.append(result)
+        if len(buffer) >= buffer_lines:
+            out.write("\n".join(buffer) + "\n")
+            count += len(buffer)
+            buffer.clear()
+    if buffer:
+        out.write("\n".join(buffer) + "\n")
+        count += len(buffer)
+    out.flush()
+    return count
+
+def run_batch(calculator, source, out, buffer_lines=4096):
+    results = evaluate_expressions(calculator, read_expressions(source))
+    return write_results(results, out, buffer_lines)
+
+def _init_worker(calculator_factory):
+    global _worker_calculator
+    # one calculator per worker process, so its compile caches stay warm across chunks
+    _worker_calculator = calculator_factory()
+
+def _evaluate_chunk(lines):
+    results = list(evaluate_expressions(_worker_calculator, read_expressions(lines)))
+    if not results:
+        return 0, ""
+    return len(results), "\n".join(results) + "\n"
+
+def read_chunks(source, chunk_size):
+    while True:
+        chunk = list(islice(source, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def evaluate_parallel(calculator_factory, source, workers=None, chunk_size=2048, ordered=True):
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(calculator_factory,)) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in read_chunks(source, chunk_size):
+                pending.append(executor.submit(_evaluate_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        else:
+            pending = set()
+            for chunk in read_chunks(source, chunk_size):
+                pending.add(executor.submit(_evaluate_chunk, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+def run_parallel_batch(calculator_factory, source, out, workers=None, chunk_size=2048, ordered=True):
+    count = 0
+    for chunk_count, text in evaluate_parallel(calculator_factory, source, workers, chunk_size, ordered):
+        if text:
+            out.write(text)
+            count += chunk_count
+    out.flush()
+    return count
+
+def open_input(path):
+    if path == "-":
+        return sys.stdin
+    return open(path, "r", encoding="utf-8", buffering=1 << 20)
+
+def open_output(path):
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", buffering=1 << 20)
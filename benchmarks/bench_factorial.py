@@ -0,0 +1,50 @@
+import argparse
+import math
+import time
+
+import factorial as factorials
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cold(n):
+    factorials._table.clear()
+    return factorials.factorial(n)
+
+
+def sweep(values, compute):
+    for n in values:
+        compute(n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prime-swing factorials with checkpoints vs. math.factorial")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 100000])
+    parser.add_argument("--sweep", type=int, default=200, help="consecutive n values per sweep")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>8} {'math.factorial':>16} {'prime swing':>14} {'sweep math':>12} "
+          f"{'sweep table':>12} {'lgamma':>10}")
+    for n in args.sizes:
+        assert cold(n) == math.factorial(n)
+        single_math = timed(lambda: math.factorial(n), args.repeat)
+        single_swing = timed(lambda: cold(n), args.repeat)
+        values = range(n, n + args.sweep)
+        sweep_math = timed(lambda: sweep(values, math.factorial), 1)
+        factorials._table.clear()
+        sweep_table = timed(lambda: sweep(values, factorials.factorial), 1)
+        lgamma = timed(lambda: factorials.log_factorial(n), args.repeat)
+        print(f"{n:8d} {single_math * 1e3:13.2f} ms {single_swing * 1e3:11.2f} ms "
+              f"{sweep_math * 1e3:9.1f} ms {sweep_table * 1e3:9.1f} ms {lgamma * 1e6:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
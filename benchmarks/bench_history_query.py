@@ -0,0 +1,64 @@
+import argparse
+import random
+import time
+
+from history import CalculationHistory
+from history_query import scan
+
+OPERATIONS = ['√', '^', 'log', 'sin', 'cos']
+
+
+def build_history(size, seed=0):
+    rng = random.Random(seed)
+    history = CalculationHistory(capacity=size)
+    now = time.time()
+    for i in range(size):
+        operation = rng.choice(OPERATIONS)
+        value = rng.uniform(0.1, 1000.0)
+        result = rng.uniform(-5.0, 5.0)
+        operands = [value, 10] if operation in ('log', '^') else [value]
+        history.add_calculation(None, result, operation, operands, timestamp=now - (size - i) * 0.01)
+    return history
+
+
+def timed(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indexed history queries vs. a linear scan")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    history = build_history(args.records)
+    print(f"built {args.records} records in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    history.query(operation='log', limit=1)
+    print(f"index build: {time.perf_counter() - start:.2f}s")
+
+    hour_ago = time.time() - 3600
+    queries = {
+        "log results in [2, 3], last hour": dict(operation='log', result_range=(2, 3), since=hour_ago),
+        "results in [4.99, 5]": dict(result_range=(4.99, 5)),
+        "last 60 seconds": dict(since=time.time() - 60),
+        "expression prefix 'sin(99'": dict(prefix='sin(99'),
+    }
+    for name, criteria in queries.items():
+        indexed, found = timed(lambda: history.query(**criteria), args.repeat)
+        linear, expected = timed(lambda: scan(history, **criteria), 1)
+        assert [r.seq for r in found] == [r.seq for r in expected]
+        print(f"{name:36} {len(found):8d} rows  indexed {indexed * 1e3:9.2f} ms  "
+              f"scan {linear * 1e3:9.2f} ms  x{linear / max(indexed, 1e-9):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+
+def make_requests(count, seed=0):
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            a, b, c = rng.randint(1, 999), rng.randint(1, 99), rng.randint(1, 9)
+            requests.append({"id": i, "expr": f"{a}*{b}+{c}/{rng.randint(1, 9)}-{a}"})
+        elif kind < 0.8:
+            requests.append({"id": i, "op": "sqrt", "args": [rng.randint(0, 10000)]})
+        elif kind < 0.95:
+            requests.append({"id": i, "op": rng.choice(["sin", "cos"]), "args": [rng.randint(0, 360)]})
+        else:
+            requests.append({"id": i, "op": "fact", "args": [rng.randint(0, 500)]})
+    return [(json.dumps(r) + "\n").encode("utf-8") for r in requests]
+
+
+async def run_connection(open_connection, lines, depth, latencies):
+    reader, writer = await open_connection()
+    window = asyncio.Semaphore(depth)
+    sent = []
+    errors = 0
+
+    async def send():
+        for line in lines:
+            await window.acquire()
+            sent.append(time.perf_counter())
+            writer.write(line)
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for i in range(len(lines)):
+        reply = await reader.readline()
+        latencies.append(time.perf_counter() - sent[i])
+        if b'"error"' in reply:
+            errors += 1
+        window.release()
+    await sender
+    writer.close()
+    await writer.wait_closed()
+    return errors
+
+
+async def load(args):
+    if args.unix:
+        def open_connection():
+            return asyncio.open_unix_connection(args.unix)
+    else:
+        def open_connection():
+            return asyncio.open_connection(args.host, args.port)
+    lines = make_requests(args.requests)
+    per_connection = [lines[i::args.connections] for i in range(args.connections)]
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(run_connection(open_connection, chunk, args.depth, latencies)
+                                    for chunk in per_connection))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{len(latencies)} requests over {args.connections} connection(s), pipeline depth {args.depth}")
+    print(f"{len(latencies) / elapsed:10.0f} req/s   p50 {p50 * 1e3:7.2f} ms   "
+          f"p99 {p99 * 1e3:7.2f} ms   errors {sum(errors)}")
+
+
+async def wait_for_server(args, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if args.unix:
+                _, writer = await asyncio.open_unix_connection(args.unix)
+            else:
+                _, writer = await asyncio.open_connection(args.host, args.port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the calculator server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=64, help="requests in flight per connection")
+    parser.add_argument("--spawn", action="store_true", help="start a local server for the run")
+    parser.add_argument("--processes", type=int, default=0, help="worker processes for a spawned server")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        command = [sys.executable, "-m", "server", "--processes", str(args.processes)]
+        command += ["--unix", args.unix] if args.unix else ["--host", args.host, "--port", str(args.port)]
+        server = subprocess.Popen(command)
+    try:
+        asyncio.run(wait_for_server(args))
+        asyncio.run(load(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
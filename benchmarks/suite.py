@@ -0,0 +1,217 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from itertools import cycle, islice
+
+from calculator import ScientificCalculator, perform_operation, perform_operations
+from core import Calculator
+from formatting import format_numbers
+from history import CalculationHistory
+
+SIZES = [1, 100, 10000]
+COMPLEXITIES = [1, 8, 64, 256]
+OPERATORS = ['+', '-', '×', '÷']
+
+
+def make_expression(rng, terms):
+    parts = [str(rng.randint(1, 999))]
+    for _ in range(terms - 1):
+        parts.append(rng.choice(OPERATORS))
+        parts.append(str(rng.randint(1, 999)))
+    return ''.join(parts)
+
+
+def case_calculate_simple(size):
+    rng = random.Random(size)
+    calc = Calculator(keep_history=False)
+    return calc.calculate, [f"{rng.uniform(0, 1e6):.3f}" for _ in range(size)]
+
+
+def case_calculate_expression(size, complexity):
+    rng = random.Random(size * 1000 + complexity)
+    calc = Calculator(keep_history=False)
+    return calc.calculate, [make_expression(rng, complexity) for _ in range(size)]
+
+
+def case_clean_expression(size, complexity):
+    rng = random.Random(size * 1000 + complexity)
+    calc = Calculator(keep_history=False)
+    return calc._clean_expression, [make_expression(rng, complexity) for _ in range(size)]
+
+
+def case_format_number(size):
+    rng = random.Random(size)
+    values = [rng.choice([rng.randint(-10**6, 10**6), rng.uniform(-1e6, 1e6),
+                          rng.uniform(1e16, 1e20), rng.uniform(1e-14, 1e-11)])
+              for _ in range(size)]
+    return Calculator(keep_history=False)._format_number, values
+
+
+def case_format_numbers(size):
+    values = case_format_number(size)[1]
+    return (lambda _: format_numbers(values)), [None], size
+
+
+def _scientific(method, make_args):
+    def case(size):
+        rng = random.Random(size)
+        calc = ScientificCalculator(history_size=1000)
+        function = getattr(calc, method)
+        return (lambda args: function(*args)), [make_args(rng) for _ in range(size)]
+    return case
+
+
+def case_perform_operation(size):
+    rng = random.Random(size)
+    calc = ScientificCalculator(history_size=1000)
+    requests = [(rng.choice(['sqrt', 'sin', 'cos', 'log']), [rng.uniform(1, 1000)])
+                for _ in range(size)]
+    return (lambda request: perform_operation(calc, *request)), requests
+
+
+def case_perform_operations(size):
+    rng = random.Random(size)
+    calc = ScientificCalculator(history_size=1000)
+    requests = [(rng.choice(['sqrt', 'sin', 'cos', 'log']), [rng.uniform(1, 1000)])
+                for _ in range(size)]
+    # one call dispatches the whole batch; throughput is reported per request
+    return (lambda _: perform_operations(calc, requests)), [None], size
+
+
+def case_history_add(size):
+    rng = random.Random(size)
+    history = CalculationHistory(capacity=max(size, 1000))
+    records = [(None, rng.uniform(0, 100), rng.choice(['√', 'sin', 'cos']), [rng.uniform(0, 100)])
+               for _ in range(size)]
+    return (lambda record: history.add_calculation(*record)), records
+
+
+CASES = {
+    "calculate.simple": (case_calculate_simple, {"size": SIZES}),
+    "calculate.expression": (case_calculate_expression, {"size": SIZES, "complexity": COMPLEXITIES}),
+    "clean_expression": (case_clean_expression, {"size": [100], "complexity": COMPLEXITIES}),
+    "format_number": (case_format_number, {"size": [100, 10000]}),
+    "format_numbers": (case_format_numbers, {"size": [100, 10000]}),
+    "scientific.square_root": (_scientific('square_root', lambda r: (r.uniform(0, 1e6),)),
+                               {"size": SIZES}),
+    "scientific.power": (_scientific('power', lambda r: (r.uniform(0, 10), r.uniform(-5, 5))),
+                         {"size": SIZES}),
+    "scientific.logarithm": (_scientific('logarithm', lambda r: (r.uniform(1, 1e6), 10)),
+                             {"size": SIZES}),
+    "scientific.sine": (_scientific('sine', lambda r: (r.uniform(0, 360),)), {"size": SIZES}),
+    "scientific.cosine": (_scientific('cosine', lambda r: (r.uniform(0, 360),)), {"size": SIZES}),
+    "scientific.factorial": (_scientific('factorial', lambda r: (r.randint(0, 2000),)),
+                             {"size": [1, 100]}),
+    "perform_operation": (case_perform_operation, {"size": SIZES}),
+    "perform_operations": (case_perform_operations, {"size": [100, 10000]}),
+    "history.add_calculation": (case_history_add, {"size": [1000, 100000]}),
+}
+
+
+def expand(name, params):
+    combos = [{}]
+    for key, values in params.items():
+        combos = [dict(combo, **{key: value}) for combo in combos for value in values]
+    for combo in combos:
+        suffix = ",".join(f"{key}={value}" for key, value in combo.items())
+        yield f"{name}[{suffix}]", combo
+
+
+def measure(function, items, per_call=1, min_time=0.2, latency_samples=2000, repeat=3):
+    # warm caches first, so cold-start effects do not leak into a single repeat
+    for item in islice(cycle(items), min(len(items), 1000)):
+        function(item)
+
+    # the best of several repeats is the least disturbed by other load on the machine
+    source = cycle(items)
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            for item in islice(source, 256):
+                function(item)
+            calls += 256
+            elapsed = time.perf_counter() - start
+        best = max(best, calls / elapsed)
+
+    samples = []
+    clock = time.perf_counter_ns
+    for item in islice(source, latency_samples):
+        begin = clock()
+        function(item)
+        samples.append(clock() - begin)
+    samples.sort()
+    return {
+        "ops_per_sec": best * per_call,
+        "p50_ns": samples[len(samples) // 2],
+        "p99_ns": samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+    }
+
+
+def run(selected=None, min_time=0.2, latency_samples=2000, repeat=3):
+    results = {}
+    for name, (factory, params) in CASES.items():
+        for case_id, combo in expand(name, params):
+            if selected and not any(pattern in case_id for pattern in selected):
+                continue
+            setup = factory(**combo)
+            function, items = setup[0], setup[1]
+            per_call = setup[2] if len(setup) > 2 else 1
+            samples = latency_samples if per_call == 1 else max(10, latency_samples // 100)
+            results[case_id] = measure(function, items, per_call, min_time, samples, repeat)
+            result = results[case_id]
+            print(f"{case_id:58} {result['ops_per_sec']:14,.0f} ops/s  "
+                  f"p50 {result['p50_ns'] / 1e3:9.2f} us  p99 {result['p99_ns'] / 1e3:9.2f} us",
+                  flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for case_id, result in results.items():
+        reference = baseline.get(case_id)
+        if reference is None:
+            continue
+        change = result["ops_per_sec"] / reference["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append((case_id, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calculator hot-path benchmarks")
+    parser.add_argument("-k", "--filter", action="append", metavar="TEXT",
+                        help="only run cases whose id contains TEXT (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.2, metavar="SECONDS",
+                        help="minimum measuring time per case (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timing repeats per case; the best one is reported (default: 3)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="fail on regressions against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed throughput drop against the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.min_time, repeat=args.repeat)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "cases": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["cases"]
+        regressions = compare(results, baseline, args.threshold)
+        for case_id, change in regressions:
+            print(f"REGRESSION {case_id}: {change:+.1%} throughput", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, capacity=256, ttl=None, clock=time.monotonic):
+        if capacity < 1:
+            raise ValueError("Cache capacity must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache TTL must be positive")
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        # engines and result caches are shared between sessions on different threads
+        self._lock = threading.Lock()
+        # expiry deadlines, only kept when a TTL is set
+        self._expires = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING and self.ttl is not None and self._expires[key] <= self.clock():
+                del self._data[key]
+                del self._expires[key]
+                self.expirations += 1
+                value = _MISSING
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            data = self._data
+            if key in data:
+                data.move_to_end(key)
+            data[key] = value
+            if self.ttl is not None:
+                self._expires[key] = self.clock() + self.ttl
+            if len(data) > self.capacity:
+                evicted, _ = data.popitem(last=False)
+                self._expires.pop(evicted, None)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "size": len(self._data),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+            if self.ttl is not None:
+                stats["ttl"] = self.ttl
+                stats["expirations"] = self.expirations
+        return stats
@@ -1,90 +1,272 @@
 
 import math
+import os
+from array import array
+from time import perf_counter_ns
 from typing import Union
 
+import factorial as factorials
+import matrix
+import metrics
+import profiling
+import streamstats
+from formatting import format_number, format_numbers
+from history import CalculationHistory, render_expression
+from memo import DEFAULT_MEMO_POLICIES, Memoizer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class CalculationResult:
-    def __init__(self, value=0, operation='', operands=None, expression='', error=''):
+    def __init__(self, value=0, operation='', operands=None, expression=None, error=''):
         self.value = value
         self.operation = operation
         self.operands = operands if operands is not None else []
-        self.expression = expression
+        self._expression = expression
         self.error = error
 
+    @property
+    def expression(self):
+        if self._expression is None:
+            if self.error or not self.operation:
+                self._expression = ''
+            else:
+                self._expression = render_expression(self.operation, self.operands)
+        return self._expression
+
+    @expression.setter
+    def expression(self, value):
+        self._expression = value
+
+class BatchResult:
+    def __init__(self, values, errors, operation='', error=''):
+        self.values = values
+        self.errors = errors
+        self.operation = operation
+        self.error = error
+
+    @property
+    def count(self):
+        return len(self.values)
+
+    def formatted(self):
+        return format_numbers(self.values)
+
+    @property
+    def error_count(self):
+        if np is not None:
+            return int(np.count_nonzero(self.errors))
+        return self.errors.count(1)
+
+def _as_float_array(values):
+    if np is not None:
+        return np.asarray(values, dtype=float)
+    if isinstance(values, array) and values.typecode == 'd':
+        return values
+    return array('d', values)
+
+def _no_errors():
+    # an empty error mask of the same type the computing paths return
+    if np is not None:
+        return np.zeros(0, dtype=bool)
+    return array('B')
+
+def _map_batch(values, func):
+    out = array('d', bytes(8 * len(values)))
+    errors = array('B', bytes(len(values)))
+    for i, value in enumerate(values):
+        try:
+            out[i] = func(value)
+        except (ValueError, OverflowError, ZeroDivisionError):
+            errors[i] = 1
+    return out, errors
+
+# a persisted log is compacted back to this many records once it holds twice as many
+HISTORY_LOG_MAX_RECORDS = 100000
+
 class BasicCalculator:
-    def __init__(self):
-        self.history = CalculationHistory()
-
-class CalculationHistory:
-    def __init__(self):
-        self.records = []
-    def add_calculation(self, expression, result, operation, operands):
-        self.records.append({
-            "expression": expression,
-            "result": result,
-            "operation": operation,
-            "operands": operands
-        })
+    def __init__(self, history_size=10000, history_path=None, history_max_records=HISTORY_LOG_MAX_RECORDS):
+        if history_path is not None:
+            self.history = CalculationHistory.open(history_path, history_size,
+                                                   max_records=history_max_records)
+        else:
+            self.history = CalculationHistory(history_size)
+
+    def close(self):
+        # fsyncs and closes the history log, if there is one
+        self.history.close()
 
 class ScientificCalculator(BasicCalculator):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, history_size=10000, history_path=None, memo_policies=DEFAULT_MEMO_POLICIES,
+                 history_max_records=HISTORY_LOG_MAX_RECORDS):
+        super().__init__(history_size, history_path, history_max_records)
+        self.memo = Memoizer(memo_policies) if memo_policies else None
+        # matrix operands may name .npy files; turned off where operands come from clients
+        self.allow_matrix_files = True
         self.math_constants = {
             'pi': math.pi,
             'e': math.e,
             'phi': (1 + math.sqrt(5)) / 2
         }
 
+    def _memoized(self, name, args, compute):
+        if self.memo is None:
+            return compute()
+        return self.memo.call(name, args, compute)
+
+    def memo_stats(self):
+        return self.memo.stats() if self.memo is not None else {}
+
+    @metrics.instrument('sqrt')
     def square_root(self, value: Union[int, float]) -> CalculationResult:
         try:
             if value < 0:
                 raise ValueError("Square root of negative number")
-            result = math.sqrt(float(value))
-            expression = f"√{value}"
-            self.history.add_calculation(expression, result, '√', [value])
-            return CalculationResult(result, '√', [value], expression)
+            result = self._memoized('square_root', (value,), lambda: math.sqrt(float(value)))
+            self.history.add_calculation(None, result, '√', [value])
+            return CalculationResult(result, '√', [value])
         except ValueError as e:
             return CalculationResult(0, '√', [value], error=str(e))
 
+    @metrics.instrument('pow')
     def power(self, base: Union[int, float], exponent: Union[int, float]) -> CalculationResult:
         try:
-            result = math.pow(float(base), float(exponent))
-            expression = f"{base}^{exponent}"
-            self.history.add_calculation(expression, result, '^', [base, exponent])
-            return CalculationResult(result, '^', [base, exponent], expression)
+            result = self._memoized('power', (base, exponent),
+                                    lambda: math.pow(float(base), float(exponent)))
+            self.history.add_calculation(None, result, '^', [base, exponent])
+            return CalculationResult(result, '^', [base, exponent])
         except Exception as e:
             return CalculationResult(0, '^', [base, exponent], error=str(e))
 
+    @metrics.instrument('log')
     def logarithm(self, value: Union[int, float], base: float = 10) -> CalculationResult:
         try:
             if value <= 0:
                 raise ValueError("Logarithm of non-positive number")
             if base <= 0 or base == 1:
                 raise ValueError("Invalid logarithm base")
-            result = math.log(float(value), base)
-            expression = f"log_{base}({value})"
-            self.history.add_calculation(expression, result, 'log', [value, base])
-            return CalculationResult(result, 'log', [value, base], expression)
+            result = self._memoized('logarithm', (value, base), lambda: math.log(float(value), base))
+            self.history.add_calculation(None, result, 'log', [value, base])
+            return CalculationResult(result, 'log', [value, base])
         except ValueError as e:
             return CalculationResult(0, 'log', [value, base], error=str(e))
 
+    @metrics.instrument('sin')
     def sine(self, angle: Union[int, float]) -> CalculationResult:
         try:
-            result = math.sin(math.radians(float(angle)))
-            expression = f"sin({angle}°)"
-            self.history.add_calculation(expression, result, 'sin', [angle])
-            return CalculationResult(result, 'sin', [angle], expression)
+            result = self._memoized('sine', (angle,), lambda: math.sin(math.radians(float(angle))))
+            self.history.add_calculation(None, result, 'sin', [angle])
+            return CalculationResult(result, 'sin', [angle])
         except Exception as e:
             return CalculationResult(0, 'sin', [angle], error=str(e))
 
+    @metrics.instrument('cos')
     def cosine(self, angle: Union[int, float]) -> CalculationResult:
         try:
-            result = math.cos(math.radians(float(angle)))
-            expression = f"cos({angle}°)"
-            self.history.add_calculation(expression, result, 'cos', [angle])
-            return CalculationResult(result, 'cos', [angle], expression)
+            result = self._memoized('cosine', (angle,), lambda: math.cos(math.radians(float(angle))))
+            self.history.add_calculation(None, result, 'cos', [angle])
+            return CalculationResult(result, 'cos', [angle])
         except Exception as e:
             return CalculationResult(0, 'cos', [angle], error=str(e))
 
+    def _record_batch(self, operation, batch, record):
+        if record:
+            n = batch.count
+            failed = batch.error_count
+            self.history.add_calculation(None, n - failed, f"{operation}[]", [n, failed])
+        return batch
+
+    def square_root_batch(self, values, record: bool = True) -> BatchResult:
+        values = _as_float_array(values)
+        if np is not None:
+            errors = values < 0
+            with np.errstate(invalid='ignore'):
+                out = np.sqrt(values)
+            out[errors] = 0
+        else:
+            out, errors = _map_batch(values, math.sqrt)
+        return self._record_batch('√', BatchResult(out, errors, '√'), record)
+
+    def power_batch(self, bases, exponents, record: bool = True) -> BatchResult:
+        bases = _as_float_array(bases)
+        if isinstance(exponents, (int, float)):
+            exponent = float(exponents)
+            if np is None:
+                out, errors = _map_batch(bases, lambda b: math.pow(b, exponent))
+                return self._record_batch('^', BatchResult(out, errors, '^'), record)
+            exponents = np.full(len(bases), exponent)
+        exponents = _as_float_array(exponents)
+        if len(exponents) != len(bases):
+            return BatchResult(_as_float_array([]), _no_errors(), '^',
+                               error="Bases and exponents must have the same length")
+        if np is not None:
+            with np.errstate(all='ignore'):
+                out = np.power(bases, exponents)
+            errors = ~np.isfinite(out) & np.isfinite(bases) & np.isfinite(exponents)
+            out[errors] = 0
+        else:
+            out, errors = _map_batch(range(len(bases)),
+                                     lambda i: math.pow(bases[i], exponents[i]))
+        return self._record_batch('^', BatchResult(out, errors, '^'), record)
+
+    def logarithm_batch(self, values, base: float = 10, record: bool = True) -> BatchResult:
+        values = _as_float_array(values)
+        if base <= 0 or base == 1:
+            return BatchResult(values[:0], _no_errors(), 'log', error="Invalid logarithm base")
+        if np is not None:
+            errors = values <= 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out = np.log(values) / math.log(base)
+            out[errors] = 0
+        else:
+            out, errors = _map_batch(values, lambda v: math.log(v, base))
+        return self._record_batch('log', BatchResult(out, errors, 'log'), record)
+
+    def sine_batch(self, angles, record: bool = True) -> BatchResult:
+        angles = _as_float_array(angles)
+        if np is not None:
+            errors = np.isinf(angles)
+            with np.errstate(invalid='ignore'):
+                out = np.sin(np.radians(angles))
+            out[errors] = 0
+        else:
+            out, errors = _map_batch(angles, lambda a: math.sin(math.radians(a)))
+        return self._record_batch('sin', BatchResult(out, errors, 'sin'), record)
+
+    def cosine_batch(self, angles, record: bool = True) -> BatchResult:
+        angles = _as_float_array(angles)
+        if np is not None:
+            errors = np.isinf(angles)
+            with np.errstate(invalid='ignore'):
+                out = np.cos(np.radians(angles))
+            out[errors] = 0
+        else:
+            out, errors = _map_batch(angles, lambda a: math.cos(math.radians(a)))
+        return self._record_batch('cos', BatchResult(out, errors, 'cos'), record)
+
+    @metrics.instrument('stats')
+    def statistics(self, source, binary: bool = False, typecode: str = 'd', workers=None,
+                   record: bool = True) -> streamstats.StreamSummary:
+        # source is an iterable of numbers or a file path (text, or raw binary values read via mmap)
+        if isinstance(source, (str, os.PathLike)):
+            summary = streamstats.summarize_file(source, binary, typecode, workers)
+        else:
+            summary = streamstats.summarize(source)
+        if record:
+            p50, p99 = summary.quantile(0.5), summary.quantile(0.99)
+            stats = summary.as_dict(quantiles=())
+            expression = (f"stats[{summary.count} values] mean={format_number(stats['mean'])} "
+                          f"sd={format_number(stats['stddev'])} min={format_number(stats['min'])} "
+                          f"max={format_number(stats['max'])} p50={format_number(p50)} "
+                          f"p99={format_number(p99)}")
+            self.history.add_calculation(expression, stats['mean'], 'stats[]',
+                                         [summary.count, stats['stddev'], stats['min'], stats['max'],
+                                          p50, p99])
+        return summary
+
+    @metrics.instrument('const')
     def get_constant(self, name: str) -> CalculationResult:
         if name in self.math_constants:
             value = self.math_constants[name]
@@ -93,40 +275,249 @@ class ScientificCalculator(BasicCalculator):
             return CalculationResult(value, 'const', [value], expression)
         return CalculationResult(0, 'const', [], error=f"Unknown constant: {name}")
 
+    @metrics.instrument('fact')
     def factorial(self, n: Union[int, float]) -> CalculationResult:
         try:
             n_int = int(float(n))
             if n_int < 0:
                 raise ValueError("Factorial not defined for negative numbers")
-            if n_int > 20:
-                raise ValueError("Factorial too large for computation (max 20!)")
-            result = math.factorial(n_int)
-            expression = f"{n_int}!"
-            self.history.add_calculation(expression, result, '!', [n_int])
-            return CalculationResult(result, '!', [n_int], expression)
+            if n_int > factorials.MAX_FACTORIAL:
+                raise ValueError(f"Factorial too large for computation (max {factorials.MAX_FACTORIAL}!)")
+            result = self._memoized('factorial', (n_int,), lambda: factorials.factorial(n_int))
+            self.history.add_calculation(None, result, '!', [n_int])
+            return CalculationResult(result, '!', [n_int])
         except (ValueError, TypeError) as e:
             operand = [float(n)] if isinstance(n, (int, float)) else []
             return CalculationResult(0, '!', operand, error=str(e))
         except Exception as e:
             return CalculationResult(0, '!', error=f"Factorial calculation failed: {str(e)}")
 
-def perform_operation(calculator, operation, args):
-    if operation in ['sqrt', 'sin', 'cos', 'log', 'fact']:
-        if len(args) != 1 and operation != 'log':
-            return CalculationResult(error=f"{operation} requires exactly 1 operand")
-        if operation == 'log':
-            if len(args) == 1:
-                args = [args[0], 10]
-            elif len(args) != 2:
-                return CalculationResult(error="log requires 1 or 2 operands")
-        if operation == 'fact':
+    @metrics.instrument('lnfact')
+    def log_factorial(self, n: Union[int, float]) -> CalculationResult:
+        try:
+            if n < 0:
+                raise ValueError("Factorial not defined for negative numbers")
+            result = factorials.log_factorial(n)
+            self.history.add_calculation(None, result, 'lnfact', [n])
+            return CalculationResult(result, 'lnfact', [n])
+        except (ValueError, TypeError) as e:
+            return CalculationResult(0, 'lnfact', [n], error=str(e))
+
+    @metrics.instrument('binom')
+    def binomial(self, n: int, k: int, log: bool = False) -> CalculationResult:
+        operation = 'lnbinom' if log else 'binom'
+        try:
+            n, k = int(n), int(k)
+            if n < 0:
+                raise ValueError("Binomial coefficient not defined for negative n")
+            if log:
+                result = factorials.log_binomial(n, k)
+            elif n > factorials.MAX_FACTORIAL:
+                raise ValueError(f"Binomial coefficient too large for computation (max n={factorials.MAX_FACTORIAL})")
+            else:
+                result = factorials.binomial(n, k)
+            self.history.add_calculation(None, result, operation, [n, k])
+            return CalculationResult(result, operation, [n, k])
+        except (ValueError, TypeError) as e:
+            return CalculationResult(0, operation, [n, k], error=str(e))
+
+
+    def _matrix_operation(self, operation, compute, operands):
+        try:
+            arrays = [matrix.as_operand(operand, self.allow_matrix_files) for operand in operands]
+            result = compute(*arrays)
+        except ValueError as e:
+            return CalculationResult(0, operation, error=str(e))
+        if np.ndim(result) == 0:
+            result = float(result)
+        # history keeps shapes, not the matrices themselves
+        shapes = [matrix.describe(a) for a in arrays]
+        self.history.add_calculation(None, matrix.describe(result), operation, shapes)
+        return CalculationResult(result, operation, shapes)
+
+    @metrics.instrument('dot')
+    def dot(self, a, b) -> CalculationResult:
+        return self._matrix_operation('dot', matrix.dot, (a, b))
+
+    @metrics.instrument('matmul')
+    def matmul(self, a, b) -> CalculationResult:
+        return self._matrix_operation('matmul', matrix.matmul, (a, b))
+
+    @metrics.instrument('inv')
+    def inverse(self, a) -> CalculationResult:
+        return self._matrix_operation('inv', matrix.inverse, (a,))
+
+    @metrics.instrument('det')
+    def determinant(self, a) -> CalculationResult:
+        return self._matrix_operation('det', matrix.determinant, (a,))
+
+    @metrics.instrument('solve')
+    def solve(self, a, b) -> CalculationResult:
+        return self._matrix_operation('solve', matrix.solve, (a, b))
+
+class OperationSpec:
+    __slots__ = ("name", "handler", "min_args", "max_args", "defaults", "convert",
+                 "convert_error", "owner", "batch")
+
+    def __init__(self, name, handler, min_args, max_args, defaults, convert, convert_error,
+                 owner, batch):
+        self.name = name
+        self.handler = handler
+        self.min_args = min_args
+        self.max_args = max_args
+        self.defaults = defaults
+        self.convert = convert
+        self.convert_error = convert_error
+        self.owner = owner
+        self.batch = batch
+
+    def arity_error(self):
+        if self.min_args == self.max_args:
+            plural = "" if self.min_args == 1 else "s"
+            return f"{self.name} requires exactly {self.min_args} operand{plural}"
+        return f"{self.name} requires {self.min_args} or {self.max_args} operands"
+
+    def prepare(self, args):
+        count = len(args)
+        if not self.min_args <= count <= self.max_args:
+            raise ValueError(self.arity_error())
+        args = list(args)
+        if count < self.max_args:
+            args.extend(self.defaults[count - self.min_args:])
+        if self.convert is not None:
             try:
-                args = [int(float(args[0]))]
+                args = [self.convert(arg) for arg in args]
             except (ValueError, TypeError):
-                return CalculationResult(error="Factorial requires a valid integer input")
-        if not hasattr(calculator, operation if operation != 'fact' else 'factorial'):
-            return CalculationResult(error=f"Operation {operation} not supported")
-        method = getattr(calculator, operation if operation != 'fact' else 'factorial')
-        result = method(*args)
-        return result
-    return CalculationResult(error=f"Operation {operation} not supported")
+                raise ValueError(self.convert_error)
+        return args
+
+
+OPERATIONS = {}
+
+
+def register_operation(name, handler, arity=1, defaults=(), convert=None,
+                       convert_error="Invalid operand", owner=object, batch=None):
+    # handler(calculator, *args); arity is a count or a (min, max) pair whose optional
+    # operands come from defaults; batch(calculator, arg_lists) may run a whole group at once
+    min_args, max_args = (arity, arity) if isinstance(arity, int) else arity
+    if len(defaults) != max_args - min_args:
+        raise ValueError(f"{name} needs {max_args - min_args} default operand(s)")
+    OPERATIONS[name] = OperationSpec(name, handler, min_args, max_args, tuple(defaults),
+                                     convert, convert_error, owner, batch)
+    return OPERATIONS[name]
+
+
+def _square_root_group(calculator, arg_lists):
+    try:
+        values = _as_float_array([args[0] for args in arg_lists])
+    except (TypeError, ValueError):
+        values = None
+    if np is None or values is None:
+        return [calculator.square_root(*args) for args in arg_lists]
+    with np.errstate(invalid='ignore'):
+        out = np.sqrt(values).tolist()
+    results = []
+    add = calculator.history.add_calculation
+    for args, value in zip(arg_lists, out):
+        operand = args[0]
+        if operand < 0:
+            results.append(calculator.square_root(operand))
+        else:
+            add(None, value, '√', [operand])
+            results.append(CalculationResult(value, '√', [operand]))
+    return results
+
+
+def _integer(value):
+    return int(float(value))
+
+
+register_operation('sqrt', ScientificCalculator.square_root, owner=ScientificCalculator,
+                   batch=_square_root_group)
+register_operation('sin', ScientificCalculator.sine, owner=ScientificCalculator)
+register_operation('cos', ScientificCalculator.cosine, owner=ScientificCalculator)
+register_operation('log', ScientificCalculator.logarithm, arity=(1, 2), defaults=(10,),
+                   owner=ScientificCalculator)
+register_operation('pow', ScientificCalculator.power, arity=2, owner=ScientificCalculator)
+register_operation('fact', ScientificCalculator.factorial, convert=_integer,
+                   convert_error="Factorial requires a valid integer input",
+                   owner=ScientificCalculator)
+register_operation('lnfact', ScientificCalculator.log_factorial, owner=ScientificCalculator)
+register_operation('binom', ScientificCalculator.binomial, arity=2, owner=ScientificCalculator)
+register_operation('dot', ScientificCalculator.dot, arity=2, owner=ScientificCalculator)
+register_operation('matmul', ScientificCalculator.matmul, arity=2, owner=ScientificCalculator)
+register_operation('inv', ScientificCalculator.inverse, owner=ScientificCalculator)
+register_operation('det', ScientificCalculator.determinant, owner=ScientificCalculator)
+register_operation('solve', ScientificCalculator.solve, arity=2, owner=ScientificCalculator)
+
+
+def _resolve(calculator, operation):
+    spec = OPERATIONS.get(operation)
+    if spec is None or not isinstance(calculator, spec.owner):
+        return None
+    return spec
+
+
+def perform_operation(calculator, operation, args):
+    profiler = profiling.PROFILER
+    if not profiler.active:
+        return _measured_perform(calculator, operation, args)
+    previous = profiler.enter(f"operation:{operation}")
+    try:
+        return _measured_perform(calculator, operation, args)
+    finally:
+        profiler.leave(previous)
+
+
+def _measured_perform(calculator, operation, args):
+    registry = metrics.REGISTRY
+    if not registry.enabled:
+        return _perform(calculator, operation, args)
+    start = perf_counter_ns()
+    result = _perform(calculator, operation, args)
+    registry.record(operation, "perform_operation", perf_counter_ns() - start, result.error)
+    return result
+
+
+def _perform(calculator, operation, args):
+    spec = _resolve(calculator, operation)
+    if spec is None:
+        return CalculationResult(error=f"Operation {operation} not supported")
+    try:
+        args = spec.prepare(args)
+    except ValueError as e:
+        return CalculationResult(error=str(e))
+    return spec.handler(calculator, *args)
+
+
+def perform_operations(calculator, requests):
+    # results come back in request order; history entries are written group by group
+    results = [None] * len(requests)
+    groups = {}
+    for index, (operation, args) in enumerate(requests):
+        groups.setdefault(operation, []).append((index, args))
+    for operation, members in groups.items():
+        spec = _resolve(calculator, operation)
+        if spec is None:
+            for index, _ in members:
+                results[index] = CalculationResult(error=f"Operation {operation} not supported")
+            continue
+        indices = []
+        arg_lists = []
+        for index, args in members:
+            try:
+                arg_lists.append(spec.prepare(args))
+                indices.append(index)
+            except ValueError as e:
+                results[index] = CalculationResult(error=str(e))
+        start = perf_counter_ns() if metrics.REGISTRY.enabled else 0
+        if spec.batch is not None:
+            group_results = spec.batch(calculator, arg_lists)
+        else:
+            handler = spec.handler
+            group_results = [handler(calculator, *args) for args in arg_lists]
+        if start:
+            metrics.REGISTRY.record(operation, "batch", perf_counter_ns() - start)
+        for index, result in zip(indices, group_results):
+            results[index] = result
+    return results
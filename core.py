@@ -0,0 +1,153 @@
+import re
+from time import perf_counter_ns
+
+import metrics
+import profiling
+from expression import ExpressionEngine, split_literals
+from formatting import format_number, format_result
+from history import ExpressionLog
+
+class Calculator:
+    def __init__(self, cache_size=256, template_cache_size=1024, keep_history=True,
+                 history_size=10000, engine=None, result_cache=None):
+        self.history = ExpressionLog(history_size)
+        self.memory = 0
+        self.previous_result = 0
+        self.keep_history = keep_history
+        self.engine = engine if engine is not None else ExpressionEngine(cache_size, template_cache_size)
+        # cleaned expression -> (formatted, value), or (None, (exception type, args))
+        self.result_cache = result_cache
+    
+    def calculate(self, expression):
+        profiler = profiling.PROFILER
+        if not profiler.active:
+            return self._measured_calculate(expression)
+        previous = profiler.enter(self.expression_shape(expression))
+        try:
+            return self._measured_calculate(expression)
+        finally:
+            profiler.leave(previous)
+    
+    def expression_shape(self, expression):
+        # "12×3+4" -> "shape:#*#+#", the tag profiler samples are grouped under
+        return "shape:" + split_literals(self._clean_expression(expression or ""))[0]
+    
+    def _measured_calculate(self, expression):
+        registry = metrics.REGISTRY
+        if not registry.enabled:
+            return self._calculate(expression)[0]
+        start = perf_counter_ns()
+        try:
+            formatted, path = self._calculate(expression)
+        except ValueError as e:
+            path = "full" if self.result_cache is None else "cached"
+            registry.record("calculate", path, perf_counter_ns() - start, str(e))
+            raise
+        registry.record("calculate", path, perf_counter_ns() - start)
+        return formatted
+    
+    def _calculate(self, expression):
+        # returns the formatted result and which code path produced it
+        if not expression or expression.strip() == "":
+            return "0", "empty"
+        
+        try:
+            cleaned = self._clean_expression(expression)
+            
+            if self._is_simple_number(cleaned):
+                result = float(cleaned)
+                formatted = self._format_number(result)
+                self._record(expression, formatted)
+                return formatted, "simple"
+            
+            if self.result_cache is not None:
+                return self._calculate_cached(expression, cleaned), "cached"
+            
+            result = self.engine.evaluate(cleaned)
+            
+            if isinstance(result, (int, float)):
+                formatted = self._format_number(result)
+                self._record(expression, formatted)
+                self.previous_result = result
+                return formatted, "full"
+            else:
+                self._record(expression, str(result))
+                return str(result), "full"
+                
+        except ZeroDivisionError:
+            raise ValueError("Division by zero")
+        except Exception as e:
+            raise ValueError(f"Invalid expression: {str(e)}")
+    
+    def _calculate_cached(self, expression, cleaned):
+        entry = self.result_cache.get(cleaned)
+        if entry is None:
+            try:
+                value = self.engine.evaluate(cleaned)
+                entry = (self._format_number(value) if isinstance(value, (int, float)) else str(value), value)
+            except Exception as e:
+                # failures are cached too and re-raised for the usual error messages below
+                entry = (None, (type(e), e.args))
+            self.result_cache.put(cleaned, entry)
+        formatted, value = entry
+        if formatted is None:
+            kind, args = value
+            raise kind(*args)
+        self._record(expression, formatted)
+        if isinstance(value, (int, float)):
+            self.previous_result = value
+        return formatted
+    
+    def _record(self, expression, formatted):
+        if self.keep_history:
+            self.history.add(expression, formatted)
+    
+    def cache_stats(self):
+        return self.engine.cache_stats()
+    
+    def memory_add(self, value):
+        try:
+            self.memory += float(value)
+        except ValueError:
+            pass
+    
+    def memory_subtract(self, value):
+        try:
+            self.memory -= float(value)
+        except ValueError:
+            pass
+    
+    def memory_recall(self):
+        return self._format_number(self.memory)
+    
+    def memory_clear(self):
+        self.memory = 0
+    
+    def _clean_expression(self, expr):
+        expr = re.sub(r'×', '*', expr)
+        expr = re.sub(r'÷', '/', expr)
+        expr = re.sub(r'\s+', '', expr)
+        expr = re.sub(r'[^0-9+\-*/().]', '', expr)
+        return expr
+    
+    def _is_simple_number(self, expr):
+        pattern = r'^[+-]?(\d+(\.\d*)?|\.\d+)$'
+        return re.match(pattern, expr) is not None
+    
+    def _format_number(self, num):
+        return format_number(num)
+
+def validate_numeric_input(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+def parse_input(expression):
+    if not expression:
+        return ""
+    cleaned = re.sub(r'[×]', '*', expression)
+    cleaned = re.sub(r'[÷]', '/', cleaned)
+    cleaned = re.sub(r'\s+', '', cleaned)
+    return cleaned.strip()
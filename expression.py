@@ -0,0 +1,351 @@
+import math
+import operator
+import re
+
+from cache import LRUCache
+
+NUMBER_PATTERN = re.compile(r'\d+\.?\d*|\.\d+')
+TOKEN_PATTERN = re.compile(r'(#)|(\*\*|//|[-+*/()])|(.)')
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+class Param:
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+
+class Unary:
+    __slots__ = ("op", "operand")
+
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+
+
+class Chain:
+    __slots__ = ("first", "rest")
+
+    def __init__(self, first, rest):
+        self.first = first
+        self.rest = rest
+
+
+class Binary:
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+def _parse_number(text):
+    if '.' in text:
+        return float(text)
+    return int(text)
+
+
+def split_literals(expr):
+    # "12*3+4" -> ("#*#+#", (12, 3, 4)); the shape is the template cache key
+    if '#' in expr:
+        raise ExpressionError("Unexpected character '#'")
+    params = tuple(_parse_number(text) for text in NUMBER_PATTERN.findall(expr))
+    return NUMBER_PATTERN.sub('#', expr), params
+
+
+def tokenize(shape):
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(shape):
+        number, op, bad = match.groups()
+        if bad is not None:
+            raise ExpressionError(f"Unexpected character '{bad}' at position {match.start()}")
+        if number is not None:
+            tokens.append(("num", number))
+        else:
+            tokens.append(("op", op))
+    return tokens
+
+
+class Parser:
+    def __init__(self, tokens, max_depth=50):
+        self.tokens = tokens
+        self.pos = 0
+        self.param_count = 0
+        self.operations = 0
+        self.depth = 0
+        self.max_depth = max_depth
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        node = self.expr()
+        if self.pos < len(self.tokens):
+            raise ExpressionError(f"Unexpected token '{self.tokens[self.pos][1]}'")
+        return node
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None, None
+
+    def chain(self, operand, ops):
+        # left-associative runs are kept flat so long inputs do not build deep trees
+        first = operand()
+        rest = []
+        while True:
+            kind, value = self.peek()
+            if kind != "op" or value not in ops:
+                break
+            self.pos += 1
+            rest.append((value, operand()))
+        if not rest:
+            return first
+        self.operations += len(rest)
+        if len(rest) == 1:
+            return Binary(rest[0][0], first, rest[0][1])
+        return Chain(first, rest)
+
+    def expr(self):
+        return self.chain(self.term, ("+", "-"))
+
+    def term(self):
+        return self.chain(self.factor, ("*", "/", "//"))
+
+    def factor(self):
+        self.depth += 1
+        if self.depth > self.max_depth:
+            raise ExpressionError("Expression is nested too deeply")
+        kind, value = self.peek()
+        if kind == "op" and value in ("+", "-"):
+            self.pos += 1
+            self.operations += 1
+            node = Unary(value, self.factor())
+        else:
+            node = self.power()
+        self.depth -= 1
+        return node
+
+    def power(self):
+        node = self.atom()
+        kind, value = self.peek()
+        if kind == "op" and value == "**":
+            self.pos += 1
+            self.operations += 1
+            # ** is right-associative and binds tighter than a unary sign on its left
+            node = Binary("**", node, self.factor())
+        return node
+
+    def atom(self):
+        kind, value = self.peek()
+        if kind is None:
+            raise ExpressionError("Unexpected end of expression")
+        self.pos += 1
+        if kind == "num":
+            self.param_count += 1
+            return Param(self.param_count - 1)
+        if value == "(":
+            node = self.expr()
+            kind, value = self.peek()
+            if value != ")":
+                raise ExpressionError("Missing closing parenthesis")
+            self.pos += 1
+            return node
+        raise ExpressionError(f"Unexpected token '{value}'")
+
+
+class EvalLimits:
+    def __init__(self, max_int_bits=65536, max_operations=10000, max_depth=50):
+        self.max_int_bits = max_int_bits
+        self.max_operations = max_operations
+        self.max_depth = max_depth
+
+
+DEFAULT_LIMITS = EvalLimits()
+
+
+def _too_large(max_bits):
+    return ExpressionError(f"Result too large (over {max_bits} bits)")
+
+
+class Overflow:
+    # stands in for an int past max_int_bits: the final result becomes +-inf,
+    # but using it as an operand raises instead of letting inf poison the arithmetic (inf*0, inf-inf)
+    __slots__ = ("sign", "max_bits")
+
+    def __init__(self, sign, max_bits):
+        self.sign = sign
+        self.max_bits = max_bits
+
+    def __neg__(self):
+        return Overflow(-self.sign, self.max_bits)
+
+    def __pos__(self):
+        return self
+
+    def _refuse(self, other):
+        raise _too_large(self.max_bits)
+
+    __add__ = __radd__ = __sub__ = __rsub__ = _refuse
+    __mul__ = __rmul__ = __truediv__ = __rtruediv__ = _refuse
+    __floordiv__ = __rfloordiv__ = __pow__ = __rpow__ = _refuse
+
+    def value(self):
+        return math.inf if self.sign > 0 else -math.inf
+
+
+def finish(value):
+    # top-level results: an overflowed int is reported as infinity
+    return value.value() if type(value) is Overflow else value
+
+
+def _odd(b):
+    return type(b) is int and b % 2 == 1
+
+
+def _float_power_limit(a, b):
+    # a ** b where b (or the result) does not fit a float; the limit is 0, 1 or +-inf
+    magnitude = abs(a)
+    if magnitude == 1:
+        return -1.0 if a < 0 and _odd(b) else 1.0
+    if magnitude == 0:
+        if b < 0:
+            raise ZeroDivisionError("0.0 cannot be raised to a negative power")
+        return 0.0
+    if (magnitude < 1) == (b > 0):
+        return 0.0
+    return -math.inf if a < 0 and _odd(b) else math.inf
+
+
+def checked_power(max_bits):
+    def power(a, b):
+        if type(a) is int and type(b) is int and b > 0:
+            bits = a.bit_length()
+            # |a| >= 2**(bits-1), so the exact result has at least (bits-1)*b bits
+            if bits > 1 and (bits - 1) * b > max_bits:
+                return Overflow(-1 if a < 0 and b % 2 else 1, max_bits)
+            result = a ** b
+            if result.bit_length() > max_bits:
+                return Overflow(-1 if result < 0 else 1, max_bits)
+            return result
+        try:
+            return a ** b
+        except OverflowError:
+            return _float_power_limit(a, b)
+    return power
+
+
+def checked_multiply(max_bits):
+    def multiply(a, b):
+        if type(a) is int and type(b) is int:
+            if a.bit_length() + b.bit_length() - 1 > max_bits:
+                return Overflow(-1 if (a < 0) != (b < 0) else 1, max_bits)
+        return a * b
+    return multiply
+
+
+def parse(shape, limits=DEFAULT_LIMITS):
+    parser = Parser(tokenize(shape), limits.max_depth)
+    node = parser.parse()
+    if parser.operations > limits.max_operations:
+        raise ExpressionError(f"Expression too complex ({parser.operations} operations, "
+                              f"limit {limits.max_operations})")
+    return node
+
+
+def compile_node(node, limits=DEFAULT_LIMITS):
+    if isinstance(node, Param):
+        index = node.index
+        return lambda p: p[index]
+    if isinstance(node, Unary):
+        operand = compile_node(node.operand, limits)
+        if node.op == "-":
+            return lambda p: -operand(p)
+        return lambda p: +operand(p)
+    if isinstance(node, Chain):
+        first = compile_node(node.first, limits)
+        steps = tuple((_binary_function(op, limits), compile_node(operand, limits))
+                      for op, operand in node.rest)
+
+        def chain(p):
+            value = first(p)
+            for function, operand in steps:
+                value = function(value, operand(p))
+            return value
+        return chain
+    left = compile_node(node.left, limits)
+    right = compile_node(node.right, limits)
+    op = node.op
+    if op == "+":
+        return lambda p: left(p) + right(p)
+    if op == "-":
+        return lambda p: left(p) - right(p)
+    if op == "/":
+        return lambda p: left(p) / right(p)
+    if op == "//":
+        return lambda p: left(p) // right(p)
+    function = _binary_function(op, limits)
+    return lambda p: function(left(p), right(p))
+
+
+def _binary_function(op, limits):
+    if op == "*":
+        return checked_multiply(limits.max_int_bits)
+    if op == "**":
+        return checked_power(limits.max_int_bits)
+    return BINARY_OPERATORS[op]
+
+
+BINARY_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+}
+
+
+def compile_template(shape, limits=DEFAULT_LIMITS):
+    return compile_node(parse(shape, limits), limits)
+
+
+class ExpressionEngine:
+    def __init__(self, cache_size=256, template_cache_size=1024, limits=None):
+        self.cache = LRUCache(cache_size)
+        self.templates = LRUCache(template_cache_size)
+        self.limits = limits if limits is not None else DEFAULT_LIMITS
+
+    def plan(self, shape):
+        plan = self.templates.get(shape)
+        if plan is None:
+            plan = compile_template(shape, self.limits)
+            self.templates.put(shape, plan)
+        return plan
+
+    def compile(self, expr):
+        entry = self.cache.get(expr)
+        if entry is None:
+            shape, params = split_literals(expr)
+            entry = (self.plan(shape), params)
+            self.cache.put(expr, entry)
+        return entry
+
+    def evaluate(self, expr):
+        plan, params = self.compile(expr)
+        return finish(plan(params))
+
+    def evaluate_template(self, shape, params):
+        return finish(self.plan(shape)(params))
+
+    def shape_count(self):
+        return len(self.templates)
+
+    def cache_stats(self):
+        return {
+            "expressions": self.cache.stats(),
+            "templates": self.templates.stats(),
+            "shapes": len(self.templates),
+        }
@@ -0,0 +1,158 @@
+import math
+import threading
+from bisect import bisect_right
+
+from cache import LRUCache
+
+MAX_FACTORIAL = 100000
+SMALL_LIMIT = 32
+# values within this distance above a cached checkpoint are finished with a plain product
+CHECKPOINT_STEP = 256
+# most terms log_binomial sums when n is past the float range
+LOG_BINOMIAL_TERMS = 100000
+
+_small_factorials = [math.factorial(n) for n in range(SMALL_LIMIT)]
+_primes = [2]
+_sieved_to = 2
+
+
+def primes_up_to(n):
+    global _primes, _sieved_to
+    if n > _sieved_to:
+        limit = max(n, 2 * _sieved_to)
+        sieve = bytearray([1]) * (limit + 1)
+        sieve[0:2] = b"\x00\x00"
+        for p in range(2, math.isqrt(limit) + 1):
+            if sieve[p]:
+                sieve[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+        _primes = [p for p in range(limit + 1) if sieve[p]]
+        _sieved_to = limit
+    return _primes[:bisect_right(_primes, n)]
+
+
+def product(values, lo=0, hi=None):
+    # balanced products keep both operands of each big multiplication about the same size
+    if hi is None:
+        hi = len(values)
+    if hi - lo <= 16:
+        result = 1
+        for i in range(lo, hi):
+            result *= values[i]
+        return result
+    mid = (lo + hi) // 2
+    return product(values, lo, mid) * product(values, mid, hi)
+
+
+def range_product(lo, hi):
+    # product of the integers in (lo, hi]
+    if hi - lo <= 16:
+        result = 1
+        for k in range(lo + 1, hi + 1):
+            result *= k
+        return result
+    mid = (lo + hi) // 2
+    return range_product(lo, mid) * range_product(mid, hi)
+
+
+def swing(n):
+    # n! / ((n // 2)!) ** 2, assembled from its prime factorisation
+    root = math.isqrt(n)
+    factors = []
+    for p in primes_up_to(n):
+        if p <= root:
+            power, q = 1, n
+            while q:
+                q //= p
+                if q & 1:
+                    power *= p
+            if power > 1:
+                factors.append(power)
+        elif (n // p) & 1:
+            factors.append(p)
+    return product(factors)
+
+
+class FactorialTable:
+    def __init__(self, capacity=64):
+        self.checkpoints = LRUCache(capacity)
+        self._keys = []
+        self._lock = threading.Lock()
+
+    def _nearest_checkpoint(self, n):
+        with self._lock:
+            index = bisect_right(self._keys, n)
+            while index:
+                m = self._keys[index - 1]
+                if m in self.checkpoints:
+                    return m
+                # evicted from the cache; forget it
+                del self._keys[index - 1]
+                index -= 1
+            return None
+
+    def _remember(self, n, value):
+        with self._lock:
+            if n not in self.checkpoints:
+                self._keys.insert(bisect_right(self._keys, n), n)
+            self.checkpoints.put(n, value)
+
+    def factorial(self, n):
+        if n < 0:
+            raise ValueError("Factorial not defined for negative numbers")
+        if n < SMALL_LIMIT:
+            return _small_factorials[n]
+        value = self.checkpoints.get(n)
+        if value is not None:
+            return value
+        m = self._nearest_checkpoint(n)
+        base = self.checkpoints.get(m) if m is not None and n - m <= CHECKPOINT_STEP else None
+        if base is not None:
+            value = base * range_product(m, n)
+        else:
+            half = self.factorial(n // 2)
+            value = half * half * swing(n)
+        self._remember(n, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.checkpoints.clear()
+            self._keys = []
+
+
+_table = FactorialTable()
+
+
+def factorial(n):
+    return _table.factorial(n)
+
+
+def log_factorial(n):
+    if n < 0:
+        raise ValueError("Factorial not defined for negative numbers")
+    try:
+        return math.lgamma(n + 1)
+    except OverflowError:
+        # ln(n!) > n for n > 1, so past the float range the result cannot be represented either
+        raise ValueError("Log-factorial too large for a float")
+
+
+def log_binomial(n, k):
+    if k < 0 or k > n:
+        return -math.inf
+    try:
+        return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+    except OverflowError:
+        pass
+    # n does not fit lgamma, but for a small k the sum of log(n - i) stays in range;
+    # math.log takes ints of any size
+    k = min(k, n - k)
+    if k > LOG_BINOMIAL_TERMS:
+        raise ValueError("Log-binomial too large for a float")
+    return math.fsum(math.log(n - i) for i in range(k)) - math.lgamma(k + 1)
+
+
+def binomial(n, k):
+    if n < 0:
+        raise ValueError("Binomial coefficient not defined for negative n")
+    return math.comb(n, k)
@@ -0,0 +1,116 @@
+import math
+
+# display rules: |x| > 1e15 or 0 < |x| < 1e-10 use 8 significant digits,
+# integral values print without a fraction, everything else gets at most 10 decimals
+LARGE = 1e15
+SMALL = 1e-10
+CACHE_SIZE = 4096
+
+_INF = float('inf')
+
+
+def _format_number(num):
+    if num == _INF:
+        return "∞"
+    if num == -_INF:
+        return "-∞"
+    if isinstance(num, int):
+        # ints past the float range display as infinity
+        try:
+            float(num)
+        except OverflowError:
+            return "∞" if num > 0 else "-∞"
+    if math.isnan(num):
+        return "NaN"
+
+    if abs(num) > LARGE:
+        return f"{num:.8g}"
+    if abs(num) < SMALL and num != 0:
+        return f"{num:.8g}"
+
+    if isinstance(num, float) and num.is_integer():
+        return str(int(num))
+
+    formatted = f"{num:.10f}".rstrip('0').rstrip('.')
+    return formatted if formatted else "0"
+
+
+# fixed-point text of recently seen floats; cleared when full so it tracks the current workload
+_fixed_cache = {}
+
+
+def _format_fixed(num):
+    text = _fixed_cache.get(num)
+    if text is None:
+        text = f"{num:.10f}".rstrip('0').rstrip('.')
+        if len(_fixed_cache) >= CACHE_SIZE:
+            _fixed_cache.clear()
+        _fixed_cache[num] = text
+    return text
+
+
+def format_number(num):
+    # common cases skip the rule chain; they give the same text as _format_number
+    kind = type(num)
+    if kind is int:
+        if -LARGE <= num <= LARGE:
+            return str(num)
+    elif kind is float:
+        if SMALL <= num <= LARGE or -LARGE <= num <= -SMALL:
+            if num.is_integer():
+                return str(int(num))
+            return _format_fixed(num)
+        if num == 0:
+            return "0"
+    return _format_number(num)
+
+
+def format_numbers(values):
+    # formats a whole sequence of results in one pass; non-numbers pass through str()
+    if hasattr(values, "tolist"):
+        # numpy and array('d') results become plain floats first
+        values = values.tolist()
+    out = []
+    append = out.append
+    cache = _fixed_cache
+    for num in values:
+        kind = type(num)
+        if kind is float and (SMALL <= num <= LARGE or -LARGE <= num <= -SMALL):
+            if num.is_integer():
+                append(str(int(num)))
+            else:
+                text = cache.get(num)
+                append(text if text is not None else _format_fixed(num))
+        elif kind is int and -LARGE <= num <= LARGE:
+            append(str(num))
+        elif isinstance(num, (int, float)):
+            append(format_number(num))
+        else:
+            append(str(num))
+    return out
+
+
+def format_result(result):
+    try:
+        if isinstance(result, str):
+            num = float(result)
+        else:
+            num = result
+
+        if num.is_integer():
+            return str(int(num))
+        if abs(num) > 1e12:
+            return f"{num:.2e}"
+        return f"{num:.10g}"
+    except (ValueError, AttributeError):
+        return str(result)
+
+
+def format_plain(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def clear_cache():
+    _fixed_cache.clear()
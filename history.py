@@ -0,0 +1,347 @@
+import time
+from array import array
+
+from history_query import HistoryIndex
+
+MAX_EXACT_FLOAT_INT = 2 ** 53
+
+RESULT_INT = 1
+OPERAND0_INT = 2
+OPERAND1_INT = 4
+
+
+def render_expression(operation, operands):
+    if operation == '√':
+        return f"√{operands[0]}"
+    if operation == '^':
+        return f"{operands[0]}^{operands[1]}"
+    if operation == 'log':
+        return f"log_{operands[1]}({operands[0]})"
+    if operation in ('sin', 'cos'):
+        return f"{operation}({operands[0]}°)"
+    if operation == '!':
+        return f"{operands[0]}!"
+    if operation.endswith('[]'):
+        return f"{operation[:-2]}[{operands[0]} values]"
+    return f"{operation}({', '.join(str(x) for x in operands)})"
+
+
+class HistoryRecord(dict):
+    # the same four keys as the old plain-dict records, so records still compare equal to dicts
+    # and serialize as JSON; seq and timestamp are attributes only
+    __slots__ = ("seq", "timestamp")
+
+    def __init__(self, seq, timestamp, operation, operands, result, expression=None):
+        if expression is None:
+            expression = render_expression(operation, operands)
+        super().__init__(expression=expression, result=result, operation=operation, operands=operands)
+        self.seq = seq
+        self.timestamp = timestamp
+
+    @property
+    def expression(self):
+        return self["expression"]
+
+    @property
+    def result(self):
+        return self["result"]
+
+    @property
+    def operation(self):
+        return self["operation"]
+
+    @property
+    def operands(self):
+        return self["operands"]
+
+    def __repr__(self):
+        return f"HistoryRecord({dict(self)!r})"
+
+
+class HistoryRecords:
+    def __init__(self, history):
+        self._history = history
+
+    def __len__(self):
+        return len(self._history)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._history.record(i) for i in range(*index.indices(len(self._history)))]
+        return self._history.record(index)
+
+    def __iter__(self):
+        for i in range(len(self._history)):
+            yield self._history.record(i)
+
+    def __bool__(self):
+        return len(self._history) > 0
+
+    def __eq__(self, other):
+        if isinstance(other, (list, HistoryRecords)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _fits_float(value):
+    return isinstance(value, float) or -MAX_EXACT_FLOAT_INT <= value <= MAX_EXACT_FLOAT_INT
+
+
+class CalculationHistory:
+    def __init__(self, capacity=10000):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self._timestamps = array('d')
+        self._results = array('d')
+        self._operand0 = array('d')
+        self._operand1 = array('d')
+        self._opcodes = array('B')
+        self._arity = array('B')
+        self._flags = array('B')
+        # rare values that do not fit the typed columns, keyed by slot
+        self._objects = {}
+        self._expressions = {}
+        self._operations = []
+        self._opcode_map = {}
+        self._head = 0
+        self._count = 0
+        self.first_seq = 0
+        self.log = None
+        self._index = None
+
+    @classmethod
+    def open(cls, path, capacity=10000, **log_options):
+        from history_log import HistoryLog
+        history = cls(capacity)
+        history.attach(HistoryLog(path, **log_options))
+        return history
+
+    def attach(self, log):
+        # only the tail that fits in the ring buffer is parsed
+        for record in log.tail(self.capacity):
+            self._store(record["expression"], record["result"], record["operation"],
+                        record["operands"], record["timestamp"])
+        self.log = log
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+
+    @property
+    def records(self):
+        return HistoryRecords(self)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def next_seq(self):
+        return self.first_seq + self._count
+
+    def _opcode(self, operation):
+        code = self._opcode_map.get(operation)
+        if code is None:
+            if len(self._operations) > 255:
+                raise ValueError("Too many distinct operations in history")
+            code = len(self._operations)
+            self._operations.append(operation)
+            self._opcode_map[operation] = code
+        return code
+
+    def add_calculation(self, expression, result, operation, operands, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        seq = self._store(expression, result, operation, operands, timestamp)
+        if self.log is not None:
+            self.log.append(timestamp, expression, result, operation, list(operands))
+        return seq
+
+    def _store(self, expression, result, operation, operands, timestamp):
+        code = self._opcode(operation)
+        operands = list(operands)
+        flags = 0
+        packed = (len(operands) <= 2 and _is_number(result) and _fits_float(result)
+                  and all(_is_number(x) and _fits_float(x) for x in operands))
+        if packed:
+            if isinstance(result, int):
+                flags |= RESULT_INT
+            for i, operand in enumerate(operands):
+                if isinstance(operand, int):
+                    flags |= OPERAND0_INT << i
+        op0 = float(operands[0]) if packed and len(operands) > 0 else 0.0
+        op1 = float(operands[1]) if packed and len(operands) > 1 else 0.0
+        value = float(result) if packed else 0.0
+
+        if self._count < self.capacity:
+            slot = self._count
+            self._timestamps.append(timestamp)
+            self._results.append(value)
+            self._operand0.append(op0)
+            self._operand1.append(op1)
+            self._opcodes.append(code)
+            self._arity.append(len(operands) if packed else 0)
+            self._flags.append(flags)
+            self._count += 1
+        else:
+            slot = self._head
+            self._head = (self._head + 1) % self.capacity
+            self.first_seq += 1
+            self._objects.pop(slot, None)
+            self._expressions.pop(slot, None)
+            self._timestamps[slot] = timestamp
+            self._results[slot] = value
+            self._operand0[slot] = op0
+            self._operand1[slot] = op1
+            self._opcodes[slot] = code
+            self._arity[slot] = len(operands) if packed else 0
+            self._flags[slot] = flags
+        if not packed:
+            self._objects[slot] = (result, operands)
+        if expression is not None:
+            self._expressions[slot] = expression
+        return self.next_seq - 1
+
+    def _slot(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("history index out of range")
+        return (self._head + index) % self.capacity
+
+    def record(self, index):
+        slot = self._slot(index)
+        if index < 0:
+            index += self._count
+        obj = self._objects.get(slot)
+        if obj is not None:
+            result, operands = obj
+            operands = list(operands)
+        else:
+            flags = self._flags[slot]
+            result = self._results[slot]
+            if flags & RESULT_INT:
+                result = int(result)
+            arity = self._arity[slot]
+            operands = []
+            if arity > 0:
+                operand = self._operand0[slot]
+                operands.append(int(operand) if flags & OPERAND0_INT else operand)
+            if arity > 1:
+                operand = self._operand1[slot]
+                operands.append(int(operand) if flags & OPERAND1_INT else operand)
+        return HistoryRecord(self.first_seq + index, self._timestamps[slot],
+                             self._operations[self._opcodes[slot]], operands, result,
+                             self._expressions.get(slot))
+
+    def query(self, operation=None, result_range=None, since=None, until=None,
+              prefix=None, limit=None):
+        if self._index is None:
+            self._index = HistoryIndex(self)
+        return self._index.query(operation, result_range, since, until, prefix, limit)
+
+    def get(self, seq):
+        index = seq - self.first_seq
+        if 0 <= index < self._count:
+            return self.record(index)
+        return None
+
+    def key_fields(self, seq):
+        index = seq - self.first_seq
+        if not 0 <= index < self._count:
+            return None
+        slot = (self._head + index) % self.capacity
+        obj = self._objects.get(slot)
+        result = obj[0] if obj is not None else self._results[slot]
+        return self._timestamps[slot], self._operations[self._opcodes[slot]], result
+
+    def clear(self):
+        self.first_seq = self.next_seq
+        for column in (self._timestamps, self._results, self._operand0, self._operand1,
+                       self._opcodes, self._arity, self._flags):
+            del column[:]
+        self._objects.clear()
+        self._expressions.clear()
+        self._head = 0
+        self._count = 0
+
+
+class ExpressionLog:
+    def __init__(self, capacity=10000):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self._entries = []
+        self._head = 0
+        self.first_seq = 0
+
+    @property
+    def next_seq(self):
+        return self.first_seq + len(self._entries)
+
+    def get(self, seq):
+        index = seq - self.first_seq
+        if 0 <= index < len(self._entries):
+            return self[index]
+        return None
+
+    def add(self, expression, result):
+        self._store((expression, result))
+
+    def append(self, entry):
+        self._store((entry, None))
+
+    def _store(self, item):
+        if len(self._entries) < self.capacity:
+            self._entries.append(item)
+        else:
+            self._entries[self._head] = item
+            self._head = (self._head + 1) % self.capacity
+            self.first_seq += 1
+
+    @staticmethod
+    def _render(item):
+        expression, result = item
+        if result is None:
+            return expression
+        return f"{expression}={result}"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        count = len(self._entries)
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(count))]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("history index out of range")
+        return self._render(self._entries[(self._head + index) % self.capacity])
+
+    def __iter__(self):
+        for i in range(len(self._entries)):
+            yield self[i]
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ExpressionLog)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def clear(self):
+        self.first_seq = self.next_seq
+        self._entries.clear()
+        self._head = 0
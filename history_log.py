@@ -0,0 +1,218 @@
+import json
+import os
+import time
+from array import array
+from datetime import datetime
+
+BLOCK_SIZE = 1 << 16
+# larger ints are written as hex, which json (and str) cannot refuse for length
+BIG_INT_BITS = 8192
+
+
+def _timestamp(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return value
+
+
+def _rfind_newline(f, end):
+    while end > 0:
+        start = max(0, end - BLOCK_SIZE)
+        f.seek(start)
+        index = f.read(end - start).rfind(b"\n")
+        if index >= 0:
+            return start + index
+        end = start
+    return -1
+
+
+def _encode_value(value):
+    if isinstance(value, int) and value.bit_length() > BIG_INT_BITS:
+        return {"hex": hex(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "hex" in value:
+        return int(value["hex"], 16)
+    return value
+
+
+def encode_record(timestamp, expression, result, operation, operands):
+    result = _encode_value(result)
+    record = {"timestamp": timestamp, "result": result, "operation": operation,
+              "operands": operands}
+    if expression is not None:
+        record["expression"] = expression
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+
+def decode_record(line):
+    record = json.loads(line)
+    record["timestamp"] = _timestamp(record.get("timestamp", 0.0))
+    record.setdefault("expression", None)
+    record["result"] = _decode_value(record.get("result"))
+    return record
+
+
+class HistoryLog:
+    def __init__(self, path, sync_every=64, sync_interval=1.0, max_records=None):
+        self.path = str(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.max_records = max_records
+        # lines already handed to the OS but not yet fsynced
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._offsets = None
+        self._count = None
+        self.recover()
+        # unbuffered, so every append reaches the OS at once and survives an exit without close()
+        self._file = open(self.path, "ab", buffering=0)
+        self._size = self._file.tell()
+
+    def recover(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            # anything after the last newline is a torn write
+            keep = _rfind_newline(f, size) + 1
+            if keep > 0:
+                line_start = _rfind_newline(f, keep - 1) + 1
+                f.seek(line_start)
+                try:
+                    json.loads(f.read(keep - line_start))
+                except ValueError:
+                    keep = line_start
+            if keep < size:
+                f.truncate(keep)
+            return size - keep
+
+    def append(self, timestamp, expression, result, operation, operands):
+        self._write(encode_record(timestamp, expression, result, operation, operands))
+        # only the fsync is batched
+        if (self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+        # compaction runs once the log holds twice the retained size, so its cost is amortized
+        if self.max_records and len(self) > 2 * self.max_records:
+            self.compact(self.max_records)
+
+    def _write(self, data):
+        self._file.write(data)
+        self._size += len(data)
+        if self._offsets is not None:
+            offset = self._offsets[-1]
+            index = data.find(b"\n")
+            while index >= 0:
+                self._offsets.append(offset + index + 1)
+                index = data.find(b"\n", index + 1)
+            self._count = len(self._offsets) - 1
+        self._unsynced += data.count(b"\n")
+
+    def sync(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _build_index(self):
+        offsets = array('q', [0])
+        with open(self.path, "rb") as f:
+            position = 0
+            while True:
+                block = f.read(BLOCK_SIZE)
+                if not block:
+                    break
+                index = block.find(b"\n")
+                while index >= 0:
+                    offsets.append(position + index + 1)
+                    index = block.find(b"\n", index + 1)
+                position += len(block)
+        self._offsets = offsets
+        self._count = len(offsets) - 1
+
+    def __len__(self):
+        if self._offsets is None:
+            self._build_index()
+        return self._count
+
+    def __getitem__(self, index):
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("history log index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return decode_record(f.read(end - start))
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield decode_record(line)
+
+    def _tail_offset(self, f, n):
+        position = f.seek(0, os.SEEK_END)
+        for _ in range(n):
+            position = _rfind_newline(f, position - 1) + 1
+            if position <= 0:
+                return 0
+        return position
+
+    def tail(self, n):
+        if n <= 0:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self._tail_offset(f, n))
+            return [decode_record(line) for line in f]
+
+    def compact(self, keep_last=None):
+        keep_last = keep_last if keep_last is not None else self.max_records
+        if keep_last is None:
+            return 0
+        tmp_path = self.path + ".tmp"
+        with open(self.path, "rb") as f, open(tmp_path, "wb") as out:
+            start = self._tail_offset(f, keep_last)
+            f.seek(start)
+            while True:
+                block = f.read(BLOCK_SIZE)
+                if not block:
+                    break
+                out.write(block)
+            out.flush()
+            os.fsync(out.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "ab", buffering=0)
+        self._size = self._file.tell()
+        self._unsynced = 0
+        self._offsets = None
+        self._count = None
+        return start
+
+    def import_json(self, json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        for record in records:
+            record["timestamp"] = _timestamp(record.get("timestamp", 0.0))
+        records.sort(key=lambda r: r["timestamp"])
+        self._write(b"".join(encode_record(record["timestamp"], record.get("expression"),
+                                           record.get("result"), record.get("operation", ""),
+                                           record.get("operands", []))
+                             for record in records))
+        self.sync()
+        return len(records)
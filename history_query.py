@@ -0,0 +1,172 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+
+PREFIX_END = "\U0010ffff"
+
+
+def _is_real(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value)
+
+
+class SortedIndex:
+    def __init__(self):
+        self.keys = []
+        self.seqs = []
+        # out-of-order inserts wait in a small sorted run that is merged in once it grows
+        self._pending = []
+        self._pending_keys = []
+        self._dirty = False
+
+    def add(self, key, seq):
+        if not self._pending and (not self.keys or key >= self.keys[-1]):
+            self.keys.append(key)
+            self.seqs.append(seq)
+        else:
+            self._pending.append((key, seq))
+            self._dirty = True
+
+    def _settle(self):
+        if not self._dirty:
+            return
+        self._pending.sort()
+        if len(self._pending) > max(4096, len(self.keys) // 8):
+            merged = list(merge(zip(self.keys, self.seqs), self._pending))
+            self.keys = [key for key, _ in merged]
+            self.seqs = [seq for _, seq in merged]
+            self._pending = []
+        self._pending_keys = [key for key, _ in self._pending]
+        self._dirty = False
+
+    def count(self, low=None, high=None, high_inclusive=True):
+        self._settle()
+        start, stop = _bounds(self.keys, low, high, high_inclusive)
+        pstart, pstop = _bounds(self._pending_keys, low, high, high_inclusive)
+        return stop - start + pstop - pstart
+
+    def range(self, low=None, high=None, high_inclusive=True):
+        self._settle()
+        start, stop = _bounds(self.keys, low, high, high_inclusive)
+        pstart, pstop = _bounds(self._pending_keys, low, high, high_inclusive)
+        return self.seqs[start:stop] + [seq for _, seq in self._pending[pstart:pstop]]
+
+    def __len__(self):
+        return len(self.keys) + len(self._pending)
+
+
+def _bounds(keys, low, high, high_inclusive):
+    start = 0 if low is None else bisect_left(keys, low)
+    if high is None:
+        stop = len(keys)
+    elif high_inclusive:
+        stop = bisect_right(keys, high)
+    else:
+        stop = bisect_left(keys, high)
+    return start, stop
+
+
+class HistoryIndex:
+    def __init__(self, history):
+        self.history = history
+        self._reset()
+
+    def _reset(self):
+        self.by_operation = {}
+        self.by_result = SortedIndex()
+        self.by_timestamp = SortedIndex()
+        self.by_expression = None
+        self._base_seq = self.history.first_seq
+        self._indexed_seq = self.history.first_seq
+
+    def refresh(self):
+        history = self.history
+        # rebuild once evicted entries would make up most of the index
+        if history.first_seq - self._base_seq > max(len(history), 1024):
+            self._reset()
+        start = max(self._indexed_seq, history.first_seq)
+        for seq in range(start, history.next_seq):
+            timestamp, operation, result = history.key_fields(seq)
+            seqs = self.by_operation.get(operation)
+            if seqs is None:
+                seqs = self.by_operation[operation] = array('q')
+            seqs.append(seq)
+            self.by_timestamp.add(timestamp, seq)
+            if _is_real(result):
+                self.by_result.add(result, seq)
+            if self.by_expression is not None:
+                self.by_expression.add(history.get(seq).expression, seq)
+        self._indexed_seq = history.next_seq
+
+    def _expression_index(self):
+        if self.by_expression is None:
+            self.by_expression = SortedIndex()
+            history = self.history
+            for seq in range(max(self._base_seq, history.first_seq), self._indexed_seq):
+                self.by_expression.add(history.get(seq).expression, seq)
+        return self.by_expression
+
+    def query(self, operation=None, result_range=None, since=None, until=None,
+              prefix=None, limit=None):
+        self.refresh()
+        history = self.history
+        candidates = []
+        if operation is not None:
+            seqs = self.by_operation.get(operation, ())
+            candidates.append((len(seqs), lambda seqs=seqs: seqs))
+        if result_range is not None:
+            low, high = result_range
+            candidates.append((self.by_result.count(low, high),
+                               lambda: self.by_result.range(low, high)))
+        if since is not None or until is not None:
+            candidates.append((self.by_timestamp.count(since, until),
+                               lambda: self.by_timestamp.range(since, until)))
+        if prefix is not None:
+            index = self._expression_index()
+            candidates.append((index.count(prefix, prefix + PREFIX_END, False),
+                               lambda: index.range(prefix, prefix + PREFIX_END, False)))
+        if candidates:
+            # drive the query from the most selective index and check the rest per record
+            seqs = sorted(min(candidates, key=lambda c: c[0])[1]())
+        else:
+            seqs = range(history.first_seq, history.next_seq)
+
+        matches = []
+        for seq in seqs:
+            fields = history.key_fields(seq)
+            if fields is None:
+                continue
+            timestamp, op, result = fields
+            if operation is not None and op != operation:
+                continue
+            if result_range is not None and not (_is_real(result) and low <= result <= high):
+                continue
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp > until:
+                continue
+            record = history.get(seq)
+            if prefix is not None and not record.expression.startswith(prefix):
+                continue
+            matches.append(record)
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches
+
+
+def scan(history, operation=None, result_range=None, since=None, until=None, prefix=None):
+    matches = []
+    for record in history.records:
+        if operation is not None and record.operation != operation:
+            continue
+        if result_range is not None and not (_is_real(record.result)
+                                             and result_range[0] <= record.result <= result_range[1]):
+            continue
+        if since is not None and record.timestamp < since:
+            continue
+        if until is not None and record.timestamp > until:
+            continue
+        if prefix is not None and not record.expression.startswith(prefix):
+            continue
+        matches.append(record)
+    return matches
@@ -0,0 +1,196 @@
+import math
+import re
+
+from expression import DEFAULT_LIMITS, checked_multiply, finish
+
+OPERATORS = {'+': '+', '-': '-', '×': '*', '÷': '/'}
+TOKEN_PATTERN = re.compile(r'[+\-×÷]|[^+\-×÷e]+(?:e[+-]?\d*)?|e')
+
+# running state before a number: (finished terms, coefficient of the open term, how the number joins it)
+START = (None, 1, '×')
+_multiply = checked_multiply(DEFAULT_LIMITS.max_int_bits)
+
+
+def parse_value(text):
+    if text == '∞':
+        return math.inf
+    if text == '-∞':
+        return -math.inf
+    if '.' in text or 'e' in text or 'N' in text:
+        return float(text)
+    return int(text)
+
+
+def _join(coefficient, op, value):
+    if op == '÷':
+        return coefficient / value
+    return _multiply(coefficient, value)
+
+
+def _finish(total, term):
+    return term if total is None else total + term
+
+
+def advance(state, op, number=None):
+    # the state after an operator, given the state before the number that precedes it
+    if state is None:
+        return None
+    total, coefficient, join = state
+    if number is None:
+        if op in '×÷':
+            return None
+        return (total, -coefficient if op == '-' else coefficient, join)
+    try:
+        term = _join(coefficient, join, parse_value(number))
+        if op in '×÷':
+            return (total, term, op)
+        return (_finish(total, term), -1 if op == '-' else 1, '×')
+    except (ArithmeticError, ValueError):
+        return None
+
+
+class ExpressionBuffer:
+    def __init__(self, text=""):
+        self.tokens = []
+        # joined text of every token except the last, built on demand and dropped on push/pop,
+        # so edits to the last operand stay cheap and bulk appends stay linear
+        self._prefix = None
+        # running state before each token, so the value only needs the last number folded in
+        self._states = []
+        if text:
+            self.append_text(text)
+
+    @property
+    def text(self):
+        if not self.tokens:
+            return ""
+        if self._prefix is None:
+            self._prefix = ''.join(self.tokens[:-1])
+        return self._prefix + self.tokens[-1]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @property
+    def last_is_number(self):
+        return bool(self.tokens) and self.tokens[-1] not in OPERATORS
+
+    @property
+    def last_is_operator(self):
+        return bool(self.tokens) and self.tokens[-1] in OPERATORS
+
+    @property
+    def decimal_added(self):
+        return self.last_is_number and '.' in self.tokens[-1]
+
+    @property
+    def complete(self):
+        return self.last_is_number
+
+    def _state_after(self, index):
+        tokens = self.tokens
+        if index < 0:
+            return START
+        if tokens[index] not in OPERATORS:
+            return self._states[index]
+        if index == 0 or tokens[index - 1] in OPERATORS:
+            return advance(self._states[index], tokens[index])
+        return advance(self._states[index - 1], tokens[index], tokens[index - 1])
+
+    def _push(self, token):
+        self._prefix = None
+        self._states.append(self._state_after(len(self.tokens) - 1))
+        self.tokens.append(token)
+
+    def _pop(self):
+        token = self.tokens.pop()
+        self._states.pop()
+        self._prefix = None
+        return token
+
+    def _replace_last(self, token):
+        self.tokens[-1] = token
+
+    def clear(self):
+        self.tokens = []
+        self._prefix = None
+        self._states = []
+
+    def set_text(self, text):
+        self.clear()
+        self.append_text(text)
+
+    def append_text(self, text):
+        for token in TOKEN_PATTERN.findall(text):
+            if token not in OPERATORS and self.last_is_number:
+                self._replace_last(self.tokens[-1] + token)
+            else:
+                self._push(token)
+
+    def push_digit(self, digit):
+        if self.last_is_number:
+            self._replace_last(self.tokens[-1] + digit)
+        else:
+            self._push(digit)
+
+    def push_decimal(self):
+        if not self.last_is_number:
+            self._push('0.')
+        elif '.' not in self.tokens[-1]:
+            self._replace_last(self.tokens[-1] + '.')
+        else:
+            return False
+        return True
+
+    def push_operator(self, op):
+        # a new operator replaces any trailing ones, including a sign left behind by backspace
+        while len(self.tokens) > 1 and self.last_is_operator and self.tokens[-2] in OPERATORS:
+            self._pop()
+        if self.last_is_operator:
+            self._replace_last(op)
+        else:
+            self._push(op)
+
+    def toggle_sign(self):
+        if self.last_is_number and self.tokens[-1][-1].isdigit():
+            last = self.tokens[-1]
+            self._replace_last(last[1:] if last.startswith('-') else '-' + last)
+            return True
+        if not self.tokens:
+            self._push('-')
+            return True
+        return False
+
+    def map_last_number(self, func):
+        if not self.last_is_number:
+            return False
+        value = float(self.tokens[-1])
+        self._replace_last(func(value))
+        return True
+
+    def backspace(self):
+        if not self.tokens:
+            return False
+        last = self.tokens[-1]
+        if len(last) == 1 or last in OPERATORS:
+            self._pop()
+        else:
+            self._replace_last(last[:-1])
+        return True
+
+    def template(self):
+        shape = ''.join('#' if token not in OPERATORS else OPERATORS[token] for token in self.tokens)
+        params = tuple(parse_value(token) for token in self.tokens if token not in OPERATORS)
+        return shape, params
+
+    def preview(self):
+        index = len(self.tokens) - 1
+        while index >= 0 and self.tokens[index] in OPERATORS:
+            index -= 1
+        if index < 0 or self._states[index] is None:
+            return None
+        total, coefficient, join = self._states[index]
+        try:
+            return finish(_finish(total, _join(coefficient, join, parse_value(self.tokens[index]))))
+        except (ArithmeticError, ValueError):
+            return None
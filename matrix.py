@@ -0,0 +1,89 @@
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def require_numpy():
+    if np is None:
+        raise ValueError("Matrix operations require NumPy")
+
+
+def as_operand(value, allow_paths=False):
+    # with allow_paths, .npy paths are memory-mapped read-only; arrays and buffers (array('d'),
+    # memoryview) are wrapped without copying when they already hold float64
+    require_numpy()
+    if isinstance(value, (str, os.PathLike)):
+        # only in-process callers may name files; the server passes client input straight through
+        if not allow_paths:
+            raise ValueError("Matrix operands must be numeric")
+        if not str(value).endswith(".npy"):
+            raise ValueError(f"Unsupported matrix file: {value}")
+        try:
+            value = np.load(value, mmap_mode='r')
+        except OSError as e:
+            raise ValueError(f"Cannot read matrix file {value}: {e.strerror or e}")
+    try:
+        operand = np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("Matrix operands must be numeric")
+    if operand.ndim not in (1, 2):
+        raise ValueError("Matrix operands must be vectors or 2-D matrices")
+    return operand
+
+
+def describe(value):
+    # compact history text: scalars as numbers, arrays by their shape only
+    if np is not None and isinstance(value, np.ndarray) and value.ndim:
+        return "×".join(str(n) for n in value.shape)
+    return float(value)
+
+
+def _square(a, name):
+    if a.ndim != 2 or a.shape[0] != a.shape[1]:
+        raise ValueError(f"{name} requires a square matrix, got {describe(a)}")
+
+
+def dot(a, b):
+    a, b = as_operand(a), as_operand(b)
+    if a.shape[-1] != b.shape[0]:
+        raise ValueError(f"Shapes {describe(a)} and {describe(b)} are not aligned")
+    return np.dot(a, b)
+
+
+def matmul(a, b, out=None):
+    a, b = as_operand(a), as_operand(b)
+    if a.shape[-1] != b.shape[0]:
+        raise ValueError(f"Shapes {describe(a)} and {describe(b)} are not aligned")
+    return np.matmul(a, b, out=out)
+
+
+def inverse(a):
+    a = as_operand(a)
+    _square(a, "Inverse")
+    try:
+        return np.linalg.inv(a)
+    except np.linalg.LinAlgError:
+        raise ValueError("Matrix is singular")
+
+
+def determinant(a):
+    a = as_operand(a)
+    _square(a, "Determinant")
+    # slogdet keeps large matrices from overflowing before the final exponent
+    sign, logdet = np.linalg.slogdet(a)
+    with np.errstate(over='ignore'):
+        return float(sign * np.exp(logdet)) if sign else 0.0
+
+
+def solve(a, b):
+    a, b = as_operand(a), as_operand(b)
+    _square(a, "Solve")
+    if b.shape[0] != a.shape[0]:
+        raise ValueError(f"Right-hand side {describe(b)} does not match {describe(a)}")
+    try:
+        return np.linalg.solve(a, b)
+    except np.linalg.LinAlgError:
+        raise ValueError("Matrix is singular")
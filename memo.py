@@ -0,0 +1,57 @@
+import math
+
+from cache import LRUCache, _MISSING
+
+
+class MemoPolicy:
+    def __init__(self, capacity=1024, ttl=None, round_digits=None):
+        self.capacity = capacity
+        self.ttl = ttl
+        # floats that agree to this many decimal places share one cached result
+        self.round_digits = round_digits
+
+    def key(self, args):
+        if self.round_digits is None:
+            if 0 in args:
+                # 0.0 and -0.0 are equal keys but can give results of opposite sign
+                return tuple((arg, math.copysign(1.0, arg)) if arg == 0 else arg for arg in args)
+            return args
+        digits = self.round_digits
+        return tuple(round(arg, digits) if isinstance(arg, float) else arg for arg in args)
+
+
+DEFAULT_MEMO_POLICIES = {
+    'square_root': MemoPolicy(),
+    'power': MemoPolicy(),
+    'logarithm': MemoPolicy(),
+    'sine': MemoPolicy(),
+    'cosine': MemoPolicy(),
+    'factorial': MemoPolicy(capacity=256),
+}
+
+
+class Memoizer:
+    def __init__(self, policies=None):
+        if policies is None:
+            policies = DEFAULT_MEMO_POLICIES
+        self.policies = dict(policies)
+        self.caches = {name: LRUCache(policy.capacity, policy.ttl)
+                       for name, policy in self.policies.items()}
+
+    def call(self, name, args, compute):
+        cache = self.caches.get(name)
+        if cache is None:
+            return compute()
+        key = self.policies[name].key(args)
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            cache.put(key, value)
+        return value
+
+    def clear(self):
+        for cache in self.caches.values():
+            cache.clear()
+
+    def stats(self):
+        return {name: cache.stats() for name, cache in self.caches.items()}
@@ -0,0 +1,194 @@
+import functools
+import json
+import os
+import threading
+from time import perf_counter_ns
+
+# latency buckets are powers of two in nanoseconds: <=256ns, <=512ns, ... <=2**31ns (~2.1s), +Inf
+FIRST_BUCKET_BITS = 8
+BUCKET_COUNT = 25
+
+
+def error_class(message):
+    # "Invalid expression: Unexpected token ')'" and friends count as one class
+    return message.split(":", 1)[0].strip() or "error"
+
+
+def bucket_bounds():
+    return [2 ** (FIRST_BUCKET_BITS + i) for i in range(BUCKET_COUNT - 1)] + [None]
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total_ns")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_ns = 0
+
+    def observe(self, elapsed_ns):
+        index = (elapsed_ns - 1).bit_length() - FIRST_BUCKET_BITS
+        if index < 0:
+            index = 0
+        elif index >= BUCKET_COUNT:
+            index = BUCKET_COUNT - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    def merge(self, other):
+        counts = self.counts
+        for i, count in enumerate(other.counts):
+            counts[i] += count
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        bounds = bucket_bounds()
+        for bound, count in zip(bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # each thread records into its own tables, so the hot path takes no lock
+        self._local = threading.local()
+        self._generation = 0
+        self._tables = []
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._generation += 1
+            self._tables = []
+
+    def _thread_tables(self):
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            with self._lock:
+                local.tables = ({}, {})
+                local.generation = self._generation
+                self._tables.append(local.tables)
+        return local.tables
+
+    def record(self, operation, path, elapsed_ns, error=None):
+        local = self._local
+        try:
+            if local.generation != self._generation:
+                raise AttributeError
+            latency, errors = local.tables
+        except AttributeError:
+            latency, errors = self._thread_tables()
+        key = (operation, path)
+        histogram = latency.get(key)
+        if histogram is None:
+            histogram = latency[key] = Histogram()
+        histogram.observe(elapsed_ns)
+        if error:
+            key = (operation, error_class(error))
+            errors[key] = errors.get(key, 0) + 1
+
+    def _merged(self):
+        latency = {}
+        errors = {}
+        with self._lock:
+            tables = list(self._tables)
+        for thread_latency, thread_errors in tables:
+            for key, histogram in list(thread_latency.items()):
+                merged = latency.get(key)
+                if merged is None:
+                    merged = latency[key] = Histogram()
+                merged.merge(histogram)
+            for key, count in list(thread_errors.items()):
+                errors[key] = errors.get(key, 0) + count
+        return latency, errors
+
+    def snapshot(self):
+        latency, errors = self._merged()
+        operations = []
+        for (operation, path), histogram in sorted(latency.items()):
+            operations.append({
+                "operation": operation,
+                "path": path,
+                "calls": histogram.count,
+                "total_ns": histogram.total_ns,
+                "mean_ns": histogram.total_ns / histogram.count if histogram.count else 0,
+                "p50_ns": histogram.quantile(0.5),
+                "p99_ns": histogram.quantile(0.99),
+                "buckets": list(histogram.counts),
+            })
+        errors = [{"operation": operation, "error": error, "count": count}
+                  for (operation, error), count in sorted(errors.items())]
+        return {"enabled": self.enabled, "bucket_bounds_ns": bucket_bounds(),
+                "operations": operations, "errors": errors}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self, prefix="calculator"):
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_calls_total counter"]
+        for entry in snapshot["operations"]:
+            labels = _labels(operation=entry["operation"], path=entry["path"])
+            lines.append(f"{prefix}_calls_total{{{labels}}} {entry['calls']}")
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for entry in snapshot["errors"]:
+            labels = _labels(operation=entry["operation"], error=entry["error"])
+            lines.append(f"{prefix}_errors_total{{{labels}}} {entry['count']}")
+        lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+        for entry in snapshot["operations"]:
+            labels = _labels(operation=entry["operation"], path=entry["path"])
+            cumulative = 0
+            for bound, count in zip(snapshot["bucket_bounds_ns"], entry["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound is None else f"{bound / 1e9:g}"
+                lines.append(f'{prefix}_latency_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{prefix}_latency_seconds_sum{{{labels}}} {entry['total_ns'] / 1e9:g}")
+            lines.append(f"{prefix}_latency_seconds_count{{{labels}}} {entry['calls']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        text = self.to_prometheus() if str(path).endswith(".prom") else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get("CALC_METRICS", "") not in ("", "0"))
+
+
+def instrument(operation, path="call"):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            registry = REGISTRY
+            if not registry.enabled:
+                return function(*args, **kwargs)
+            start = perf_counter_ns()
+            result = function(*args, **kwargs)
+            registry.record(operation, path, perf_counter_ns() - start, getattr(result, "error", None))
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+MODES = ("cprofile", "sample")
+DEFAULT_INTERVAL = 0.005
+MAX_DEPTH = 128
+
+
+def frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse(frame):
+    # root-first "file:function;file:function" as used by flamegraph tools
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class Profiler:
+    def __init__(self):
+        self.mode = None
+        # mode of the most recent run, which decides the output format of write()
+        self.last_mode = None
+        self.interval = DEFAULT_INTERVAL
+        self.samples = Counter()
+        self._profile = None
+        self._sampler = None
+        self._stopping = threading.Event()
+        # thread id -> tag of the evaluation it is running, e.g. "shape:#+#"
+        self._tags = {}
+
+    @property
+    def active(self):
+        return self.mode is not None
+
+    def start(self, mode="sample", interval=DEFAULT_INTERVAL):
+        if self.mode is not None:
+            raise RuntimeError(f"Profiler already running ({self.mode})")
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        self.reset()
+        if mode == "cprofile":
+            # cProfile only follows the thread that starts it
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self.interval = interval
+            self._stopping.clear()
+            self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+        self.mode = self.last_mode = mode
+
+    def stop(self):
+        if self.mode == "cprofile":
+            self._profile.disable()
+        elif self.mode == "sample":
+            self._stopping.set()
+            self._sampler.join()
+            self._sampler = None
+        self.mode = None
+        self._tags.clear()
+
+    def enter(self, tag):
+        # returns the previous tag so nested entry points restore it in leave()
+        ident = threading.get_ident()
+        previous = self._tags.get(ident)
+        self._tags[ident] = tag
+        return previous
+
+    def leave(self, previous):
+        ident = threading.get_ident()
+        if previous is None:
+            self._tags.pop(ident, None)
+        else:
+            self._tags[ident] = previous
+
+    def _sample(self):
+        own = threading.get_ident()
+        samples = self.samples
+        while not self._stopping.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = collapse(frame)
+                tag = self._tags.get(ident)
+                samples[f"{tag};{stack}" if tag else stack] += 1
+
+    def write(self, path):
+        # call after stop(): cProfile runs dump pstats, sampling runs write collapsed stacks
+        if self.mode is not None:
+            raise RuntimeError("Stop the profiler before writing its output")
+        if self.last_mode == "cprofile":
+            self._profile.dump_stats(path)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def reset(self):
+        self._profile = None
+        self.samples = Counter()
+
+
+PROFILER = Profiler()
+
+
+def start_from_environment(mode=None, interval=None):
+    # CALC_PROFILE=cprofile|sample turns profiling on; CALC_PROFILE_INTERVAL sets the sample period
+    mode = mode or os.environ.get("CALC_PROFILE") or None
+    if mode is None or PROFILER.active:
+        return False
+    if interval is None:
+        interval = float(os.environ.get("CALC_PROFILE_INTERVAL", DEFAULT_INTERVAL))
+    PROFILER.start(mode, interval)
+    return True
+
+
+def stop_and_write(path=None):
+    # CALC_PROFILE_OUT overrides the default file name
+    PROFILER.stop()
+    if path is None:
+        path = os.environ.get("CALC_PROFILE_OUT") or (
+            "calculator.pstats" if PROFILER.last_mode == "cprofile" else "calculator.collapsed")
+    PROFILER.write(path)
+    return path
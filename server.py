@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from calculator import CalculationResult, ScientificCalculator, perform_operation, perform_operations
+from core import Calculator
+from expression import ExpressionEngine
+from history_log import _encode_value
+
+MAX_LINE = 1 << 20
+
+_worker_state = None
+
+
+def _init_worker(cache_size=1024, history_size=1000):
+    global _worker_state
+    # one engine and calculator per executor worker, so caches stay warm across batches
+    calculator = ScientificCalculator(history_size)
+    # clients must not make the server open files by passing paths as matrix operands
+    calculator.allow_matrix_files = False
+    _worker_state = (Calculator(keep_history=False, engine=ExpressionEngine(cache_size)), calculator)
+
+
+def _response(request_id, result=None, error=None):
+    if error is not None:
+        message = {"id": request_id, "error": error}
+    else:
+        if hasattr(result, "tolist"):
+            # matrix results go out as nested lists, not numpy's abbreviated repr
+            result = result.tolist()
+        message = {"id": request_id, "result": _encode_value(result)}
+    return json.dumps(message, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+def _evaluate_expression(expressions, expression):
+    # same cleaning as Calculator.calculate, but the raw value goes back to the client
+    try:
+        return expressions.engine.evaluate(expressions._clean_expression(expression)), None
+    except ZeroDivisionError:
+        return None, "Division by zero"
+    except Exception as e:
+        return None, f"Invalid expression: {str(e)}"
+
+
+def evaluate_lines(lines):
+    # parses, evaluates and encodes a whole micro-batch, keeping all of it off the event loop
+    if _worker_state is None:
+        _init_worker()
+    expressions, calculator = _worker_state
+    responses = [None] * len(lines)
+    operations = []
+    for i, line in enumerate(lines):
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+        except (ValueError, AttributeError):
+            responses[i] = _response(None, error="Malformed request")
+            continue
+        if "expr" in request:
+            result, error = _evaluate_expression(expressions, str(request["expr"]))
+            responses[i] = _response(request_id, result, error)
+        elif "op" in request:
+            args = request.get("args", [])
+            if not isinstance(args, list):
+                args = [args]
+            operations.append((i, request_id, request["op"], args))
+        else:
+            responses[i] = _response(request_id, error="Request needs 'expr' or 'op'")
+    if operations:
+        results = _perform_isolated(calculator, [(op, args) for _, _, op, args in operations])
+        for (i, request_id, _, _), result in zip(operations, results):
+            if result.error:
+                responses[i] = _response(request_id, error=result.error)
+            else:
+                responses[i] = _response(request_id, result.value)
+    return responses
+
+
+def _perform_isolated(calculator, requests):
+    # a request whose operation raises fails alone, not with the rest of its micro-batch
+    results = [None] * len(requests)
+    groups = {}
+    for index, (operation, _) in enumerate(requests):
+        groups.setdefault(operation, []).append(index)
+    for operation, indices in groups.items():
+        try:
+            group = perform_operations(calculator, [requests[i] for i in indices])
+        except Exception:
+            group = [_perform_one(calculator, *requests[i]) for i in indices]
+        for index, result in zip(indices, group):
+            results[index] = result
+    return results
+
+
+def _perform_one(calculator, operation, args):
+    try:
+        return perform_operation(calculator, operation, args)
+    except Exception as e:
+        return CalculationResult(error=f"Invalid operands for {operation}: {e}")
+
+
+class MicroBatcher:
+    def __init__(self, executor, max_batch=256, max_delay=0.001, concurrency=1):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.concurrency = concurrency
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, line):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((line, future))
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        # requests keep queueing while every executor slot is busy, so batches grow under load
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+            self.batches += 1
+            self.requests += len(batch)
+            asyncio.create_task(self._dispatch(batch, slots))
+
+    async def _dispatch(self, batch, slots):
+        loop = asyncio.get_running_loop()
+        lines = [line for line, _ in batch]
+        try:
+            responses = await loop.run_in_executor(self.executor, evaluate_lines, lines)
+        except Exception as e:
+            responses = [_response(None, error=f"Server error: {e}")] * len(batch)
+        finally:
+            slots.release()
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+
+class EvaluationServer:
+    def __init__(self, executor, max_batch=256, max_delay=0.001, concurrency=1,
+                 max_in_flight=1024):
+        self.batcher = MicroBatcher(executor, max_batch, max_delay, concurrency)
+        self.max_in_flight = max_in_flight
+        self._batch_task = None
+
+    async def start(self):
+        self._batch_task = asyncio.create_task(self.batcher.run())
+
+    async def stop(self):
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+
+    async def handle(self, reader, writer):
+        # requests are read ahead of their replies; responses go out in request order
+        pending = asyncio.Queue(self.max_in_flight)
+        sender = asyncio.create_task(self._send(pending, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await pending.put(_completed(_response(None, error="Request line too long")))
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(self.batcher.submit(line))
+        finally:
+            await pending.put(None)
+            await sender
+            writer.close()
+
+    async def _send(self, pending, writer):
+        connected = True
+        while True:
+            future = await pending.get()
+            if future is None:
+                break
+            response = await future
+            if not connected:
+                # keep consuming so the reader is never blocked on a full queue
+                continue
+            writer.write(response)
+            if pending.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    connected = False
+        if connected:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+
+def _completed(value):
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(value)
+    return future
+
+
+def make_executor(processes):
+    if processes:
+        return ProcessPoolExecutor(max_workers=processes, initializer=_init_worker)
+    # a single thread keeps the engine and calculator caches unshared
+    return ThreadPoolExecutor(max_workers=1, initializer=_init_worker)
+
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None, processes=0, max_batch=256,
+                max_delay=0.001, ready=None):
+    executor = make_executor(processes)
+    server = EvaluationServer(executor, max_batch, max_delay, concurrency=max(processes, 1))
+    await server.start()
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle, unix_path, limit=MAX_LINE)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, limit=MAX_LINE)
+    if ready is not None:
+        ready(listener)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if unix_path and os.path.exists(unix_path):
+            os.unlink(unix_path)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Line-delimited JSON calculator server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--processes", type=int, default=0, metavar="N",
+                        help="evaluate batches in N worker processes (default: one thread)")
+    parser.add_argument("--max-batch", type=int, default=256, metavar="N",
+                        help="largest number of requests evaluated together (default: 256)")
+    parser.add_argument("--max-delay", type=float, default=1.0, metavar="MS",
+                        help="how long a batch waits to fill up, in milliseconds (default: 1)")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    address = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving on {address}", file=sys.stderr)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.processes, args.max_batch,
+                          args.max_delay / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import itertools
+import threading
+
+from cache import LRUCache
+from core import Calculator
+from expression import ExpressionEngine
+
+
+class Session(Calculator):
+    def __init__(self, session_id, engine, result_cache, history_size=1000):
+        super().__init__(history_size=history_size, engine=engine, result_cache=result_cache)
+        self.id = session_id
+        # guards this session's memory register and history; evaluation runs on shared caches
+        self.lock = threading.RLock()
+
+    def calculate(self, expression):
+        with self.lock:
+            return super().calculate(expression)
+
+    def memory_add(self, value):
+        with self.lock:
+            super().memory_add(value)
+
+    def memory_subtract(self, value):
+        with self.lock:
+            super().memory_subtract(value)
+
+    def memory_recall(self):
+        with self.lock:
+            return super().memory_recall()
+
+    def memory_clear(self):
+        with self.lock:
+            super().memory_clear()
+
+    def history_snapshot(self):
+        with self.lock:
+            return list(self.history)
+
+
+class SessionManager:
+    def __init__(self, stripes=16, cache_size=4096, template_cache_size=1024,
+                 result_cache_size=4096, history_size=1000):
+        self.engine = ExpressionEngine(cache_size, template_cache_size)
+        self.results = LRUCache(result_cache_size)
+        self.history_size = history_size
+        # sessions are spread over independently locked stripes so lookups rarely contend
+        self._stripes = [(threading.Lock(), {}) for _ in range(stripes)]
+        self._ids = itertools.count(1)
+
+    def _stripe(self, session_id):
+        return self._stripes[hash(session_id) % len(self._stripes)]
+
+    def open(self, session_id=None):
+        if session_id is None:
+            session_id = next(self._ids)
+        lock, sessions = self._stripe(session_id)
+        with lock:
+            session = sessions.get(session_id)
+            if session is None:
+                session = sessions[session_id] = Session(session_id, self.engine, self.results,
+                                                         self.history_size)
+            return session
+
+    def get(self, session_id):
+        lock, sessions = self._stripe(session_id)
+        with lock:
+            return sessions.get(session_id)
+
+    def close(self, session_id):
+        lock, sessions = self._stripe(session_id)
+        with lock:
+            return sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return sum(len(sessions) for _, sessions in self._stripes)
+
+    def cache_stats(self):
+        stats = self.engine.cache_stats()
+        stats["results"] = self.results.stats()
+        stats["sessions"] = len(self)
+        return stats
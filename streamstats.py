@@ -0,0 +1,303 @@
+import math
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK_SIZE = 65536
+RELATIVE_ACCURACY = 0.01
+MAX_BINS = 2048
+# magnitudes below this land in the sketch's zero bucket
+MIN_INDEXABLE = 1e-300
+
+
+class QuantileSketch:
+    # DDSketch: logarithmic buckets give quantiles within RELATIVE_ACCURACY of the true value,
+    # and two sketches with the same accuracy merge by adding bucket counts
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, max_bins=MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def key(self, magnitude):
+        return math.ceil(math.log(magnitude) / self.log_gamma)
+
+    def value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, x):
+        if x > MIN_INDEXABLE:
+            store = self.positive
+            key = self.key(x)
+        elif x < -MIN_INDEXABLE:
+            store = self.negative
+            key = self.key(-x)
+        else:
+            self.zero_count += 1
+            self.count += 1
+            return
+        store[key] = store.get(key, 0) + 1
+        self.count += 1
+        if len(store) > self.max_bins:
+            self._collapse(store)
+
+    def extend(self, values):
+        if np is not None and isinstance(values, np.ndarray):
+            self._extend_array(values)
+            return
+        log_gamma = self.log_gamma
+        positive, negative = self.positive, self.negative
+        log, ceil = math.log, math.ceil
+        zero = count = 0
+        for x in values:
+            if x > MIN_INDEXABLE:
+                key = ceil(log(x) / log_gamma)
+                positive[key] = positive.get(key, 0) + 1
+            elif x < -MIN_INDEXABLE:
+                key = ceil(log(-x) / log_gamma)
+                negative[key] = negative.get(key, 0) + 1
+            else:
+                zero += 1
+            count += 1
+        self.zero_count += zero
+        self.count += count
+        for store in (positive, negative):
+            if len(store) > self.max_bins:
+                self._collapse(store)
+
+    def _extend_array(self, values):
+        for sign, store in ((1, self.positive), (-1, self.negative)):
+            magnitudes = values[values * sign > MIN_INDEXABLE] * sign
+            if len(magnitudes):
+                keys, counts = np.unique(np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64),
+                                         return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + count
+                if len(store) > self.max_bins:
+                    self._collapse(store)
+        zeros = int(np.count_nonzero(np.abs(values) <= MIN_INDEXABLE))
+        self.zero_count += zeros
+        self.count += len(values)
+
+    def _collapse(self, store):
+        # fold the smallest magnitudes into one bucket, keeping the relative error for the rest
+        keys = sorted(store)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        folded = sum(store.pop(key) for key in excess)
+        target = keys[len(excess)]
+        store[target] += folded
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+            if len(mine) > self.max_bins:
+                self._collapse(mine)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        if not self.count:
+            return math.nan
+        rank = round(q * (self.count - 1))
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self.value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self.value(key)
+        return self.value(max(self.positive))
+
+
+class StreamSummary:
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.count = 0
+        self.mean = 0.0
+        # sum of squared deviations from the mean (Welford's M2)
+        self.m2 = 0.0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        # NaN and infinities are counted here and left out of everything else
+        self.skipped = 0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, x):
+        x = float(x)
+        if not math.isfinite(x):
+            self.skipped += 1
+            return
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.total += x
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+        self.sketch.add(x)
+
+    def extend(self, values):
+        # chunks are summarised with two passes in memory and merged in with Chan's formula
+        if np is not None and isinstance(values, np.ndarray):
+            chunks = (values[i:i + CHUNK_SIZE] for i in range(0, len(values), CHUNK_SIZE))
+        else:
+            values = iter(values)
+            chunks = iter(lambda: list(islice(values, CHUNK_SIZE)), [])
+        for chunk in chunks:
+            self._extend_chunk(chunk)
+        return self
+
+    def _extend_chunk(self, chunk):
+        if np is not None and isinstance(chunk, np.ndarray):
+            chunk = chunk.astype(np.float64, copy=False)
+            finite = chunk[np.isfinite(chunk)]
+            self.skipped += len(chunk) - len(finite)
+            if not len(finite):
+                return
+            n = len(finite)
+            mean = float(finite.mean())
+            m2 = float(np.square(finite - mean).sum())
+            total = float(finite.sum())
+            low, high = float(finite.min()), float(finite.max())
+            self.sketch.extend(finite)
+        else:
+            finite = [x for x in map(float, chunk) if math.isfinite(x)]
+            self.skipped += len(chunk) - len(finite)
+            if not finite:
+                return
+            n = len(finite)
+            total = math.fsum(finite)
+            mean = total / n
+            m2 = math.fsum((x - mean) ** 2 for x in finite)
+            low, high = min(finite), max(finite)
+            self.sketch.extend(finite)
+        self._combine(n, mean, m2, total, low, high)
+
+    def _combine(self, n, mean, m2, total, low, high):
+        count = self.count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * n / count
+        self.mean += delta * n / count
+        self.count = count
+        self.total += total
+        self.minimum = min(self.minimum, low)
+        self.maximum = max(self.maximum, high)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.total, other.minimum, other.maximum)
+            self.sketch.merge(other.sketch)
+        self.skipped += other.skipped
+        return self
+
+    def variance(self, sample=True):
+        n = self.count - 1 if sample else self.count
+        return self.m2 / n if n > 0 else math.nan
+
+    def stddev(self, sample=True):
+        return math.sqrt(self.variance(sample))
+
+    def quantile(self, q):
+        # bucket midpoints can overshoot the observed range at the extremes
+        value = self.sketch.quantile(q)
+        return min(max(value, self.minimum), self.maximum) if self.count else value
+
+    def as_dict(self, quantiles=(0.5, 0.9, 0.99)):
+        empty = not self.count
+        return {
+            "count": self.count,
+            "skipped": self.skipped,
+            "mean": math.nan if empty else self.mean,
+            "variance": self.variance(),
+            "stddev": self.stddev(),
+            "min": math.nan if empty else self.minimum,
+            "max": math.nan if empty else self.maximum,
+            "sum": self.total,
+            "quantiles": {q: self.quantile(q) for q in quantiles},
+        }
+
+
+def read_text(source):
+    # numbers separated by whitespace or commas, from a path or an open text stream
+    stream = open(source, "r", encoding="utf-8") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        for line in stream:
+            for token in line.replace(",", " ").split():
+                yield float(token)
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+def read_binary(path, typecode="d", chunk_size=CHUNK_SIZE, start=0, stop=None):
+    # raw native-endian values (array typecodes, e.g. 'd' or 'f') read through mmap, one chunk at a time
+    itemsize = array(typecode).itemsize
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < itemsize:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            count = size // itemsize
+            stop = count if stop is None else min(stop, count)
+            for i in range(start, stop, chunk_size):
+                data = mm[i * itemsize:min(i + chunk_size, stop) * itemsize]
+                if np is not None:
+                    yield np.frombuffer(data, dtype=typecode).astype(np.float64)
+                else:
+                    part = array(typecode)
+                    part.frombytes(data)
+                    yield part.tolist()
+
+
+def summarize(values, relative_accuracy=RELATIVE_ACCURACY):
+    return StreamSummary(relative_accuracy).extend(values)
+
+
+def _summarize_range(path, typecode, start, stop, relative_accuracy):
+    summary = StreamSummary(relative_accuracy)
+    for chunk in read_binary(path, typecode, CHUNK_SIZE, start, stop):
+        summary._extend_chunk(chunk)
+    return summary
+
+
+def summarize_file(path, binary=False, typecode="d", workers=None, relative_accuracy=RELATIVE_ACCURACY):
+    # binary files can be split across worker processes; their partial summaries merge exactly
+    # (mean, variance, min/max) or within the sketch accuracy (quantiles)
+    if not binary:
+        return summarize(read_text(path), relative_accuracy)
+    total = os.path.getsize(path) // array(typecode).itemsize
+    if not workers or workers == 1 or total <= CHUNK_SIZE:
+        return _summarize_range(path, typecode, 0, total, relative_accuracy)
+    step = max(CHUNK_SIZE, -(-total // workers))
+    summary = StreamSummary(relative_accuracy)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_summarize_range, path, typecode, start, min(start + step, total),
+                                   relative_accuracy)
+                   for start in range(0, total, step)]
+        for future in futures:
+            summary.merge(future.result())
+    return summary
+
@@ -0,0 +1,38 @@
+import io
+import unittest
+from functools import partial
+import batch
+from main import Calculator
+
+class TestBatch(unittest.TestCase):
+    def test_run_batch(self):
+        source = io.StringIO("1+2\n\n 3 × 4\n5/0\n2+\n10 ÷ 4\n")
+        out = io.StringIO()
+        count = batch.run_batch(Calculator(keep_history=False), source, out, buffer_lines=2)
+        self.assertEqual(count, 5)
+        self.assertEqual(out.getvalue().splitlines(), [
+            "3", "12", "Error: Division by zero",
+            "Error: Invalid expression: Unexpected end of expression", "2.5"])
+
+    def test_history_disabled(self):
+        calc = Calculator(keep_history=False)
+        batch.run_batch(calc, io.StringIO("1+1\n2+2\n"), io.StringIO())
+        self.assertEqual(calc.history, [])
+
+    def test_parallel_matches_sequential(self):
+        lines = "".join(f"{i}*3+{i % 7}/2\n" for i in range(500)) + "1/0\n\n"
+        expected = io.StringIO()
+        batch.run_batch(Calculator(keep_history=False), io.StringIO(lines), expected)
+        factory = partial(Calculator, keep_history=False)
+        ordered = io.StringIO()
+        count = batch.run_parallel_batch(factory, io.StringIO(lines), ordered, workers=2, chunk_size=37)
+        self.assertEqual(count, 501)
+        self.assertEqual(ordered.getvalue(), expected.getvalue())
+        unordered = io.StringIO()
+        batch.run_parallel_batch(factory, io.StringIO(lines), unordered, workers=2,
+                                 chunk_size=37, ordered=False)
+        self.assertEqual(sorted(unordered.getvalue().splitlines()),
+                         sorted(expected.getvalue().splitlines()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import math
+import unittest
+from array import array
+import calculator
+from calculator import ScientificCalculator
+
+class BatchOperationTests:
+    # run once with NumPy (when installed) and once on the array('d') fallback
+    numpy = True
+
+    def setUp(self):
+        self.saved_np = calculator.np
+        if not self.numpy:
+            calculator.np = None
+        elif calculator.np is None:
+            self.skipTest("NumPy is not installed")
+        self.calc = ScientificCalculator()
+
+    def tearDown(self):
+        calculator.np = self.saved_np
+
+    def check(self, batch, values, errors):
+        self.assertEqual(list(batch.errors), [bool(e) for e in errors] if self.numpy else errors)
+        self.assertEqual(batch.count, len(values))
+        self.assertEqual(batch.error_count, sum(errors))
+        for got, expected in zip(list(batch.values), values):
+            self.assertAlmostEqual(got, expected)
+
+    def last_record(self):
+        return self.calc.history.records[-1]
+
+    def test_square_root(self):
+        batch = self.calc.square_root_batch([4, -1, 2.25])
+        self.check(batch, [2, 0, 1.5], [0, 1, 0])
+        record = self.last_record()
+        self.assertEqual((record.operation, record.result, record.operands), ('√[]', 2, [3, 1]))
+        self.assertEqual(record.expression, "√[3 values]")
+
+    def test_power(self):
+        self.check(self.calc.power_batch([2, 3, 10], 2), [4, 9, 100], [0, 0, 0])
+        self.check(self.calc.power_batch([2, 1e200], [3, 2]), [8, 0], [0, 1])
+        self.assertEqual(self.last_record().operands, [2, 1])
+        mismatch = self.calc.power_batch([1, 2], [1])
+        self.assertEqual(mismatch.error, "Bases and exponents must have the same length")
+        self.assertEqual((mismatch.count, mismatch.error_count), (0, 0))
+        self.assertEqual(type(mismatch.errors), type(self.calc.square_root_batch([1]).errors))
+
+    def test_logarithm(self):
+        self.check(self.calc.logarithm_batch([100, 0, -5, 1000]), [2, 0, 0, 3], [0, 1, 1, 0])
+        self.check(self.calc.logarithm_batch(array('d', [8]), base=2), [3], [0])
+        invalid = self.calc.logarithm_batch([1, 2], base=1)
+        self.assertEqual((invalid.error, invalid.count, invalid.error_count),
+                         ("Invalid logarithm base", 0, 0))
+
+    def test_trigonometry(self):
+        self.check(self.calc.sine_batch([0, 30, math.inf]), [0, 0.5, 0], [0, 0, 1])
+        self.check(self.calc.cosine_batch([0, 60, -math.inf]), [1, 0.5, 0], [0, 0, 1])
+        self.assertEqual([r.operation for r in self.calc.history.records], ['sin[]', 'cos[]'])
+
+    def test_record_false_skips_history(self):
+        self.calc.square_root_batch([1, 4, 9], record=False)
+        self.calc.cosine_batch([0], record=False)
+        self.assertEqual(len(self.calc.history.records), 0)
+        self.calc.sine_batch(range(1000))
+        self.assertEqual(len(self.calc.history.records), 1)
+
+class TestBatchOperationsNumpy(BatchOperationTests, unittest.TestCase):
+    numpy = True
+
+class TestBatchOperationsFallback(BatchOperationTests, unittest.TestCase):
+    numpy = False
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import time
+import unittest
+from expression import EvalLimits, ExpressionEngine, ExpressionError
+from input_buffer import ExpressionBuffer
+from main import Calculator
+
+class TestExpressionEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = ExpressionEngine(cache_size=2)
+
+    def test_precedence(self):
+        self.assertEqual(self.engine.evaluate("2+3*4"), 14)
+        self.assertEqual(self.engine.evaluate("(2+3)*4"), 20)
+        self.assertEqual(self.engine.evaluate("-2**2"), -4)
+        self.assertEqual(self.engine.evaluate("2**3**2"), 512)
+        self.assertEqual(self.engine.evaluate("7//2"), 3)
+        self.assertEqual(self.engine.evaluate("7/2"), 3.5)
+        self.assertEqual(self.engine.evaluate("2--3"), 5)
+
+    def test_keeps_int_and_float_types(self):
+        self.assertIsInstance(self.engine.evaluate("2*3"), int)
+        self.assertIsInstance(self.engine.evaluate("2.*3"), float)
+
+    def test_invalid_expressions(self):
+        for expr in ["", "2+", "(2", "2)", "1..2", "2(3)", "*2"]:
+            with self.assertRaises(ExpressionError):
+                self.engine.evaluate(expr)
+        with self.assertRaises(ZeroDivisionError):
+            self.engine.evaluate("1/0")
+
+    def test_cache_statistics(self):
+        self.engine.evaluate("1+1")
+        self.engine.evaluate("1+1")
+        self.engine.evaluate("2+2")
+        self.engine.evaluate("3+3")
+        stats = self.engine.cache_stats()["expressions"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 3)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["size"], 2)
+
+    def test_templates_shared_across_literals(self):
+        self.assertEqual(self.engine.evaluate("12*3+4"), 40)
+        self.assertEqual(self.engine.evaluate("7*9+1"), 64)
+        self.assertEqual(self.engine.evaluate("7.5*2+1"), 16.0)
+        stats = self.engine.cache_stats()
+        self.assertEqual(stats["shapes"], 1)
+        self.assertEqual(stats["templates"]["hits"], 2)
+        self.assertEqual(self.engine.evaluate_template("#-#", (5, 8)), -3)
+
+class TestEvaluationLimits(unittest.TestCase):
+    def setUp(self):
+        self.engine = ExpressionEngine()
+
+    def test_runaway_powers_become_infinity(self):
+        self.assertEqual(self.engine.evaluate("10**10**8"), float('inf'))
+        self.assertEqual(self.engine.evaluate("-3**3**30"), float('-inf'))
+        self.assertEqual(self.engine.evaluate("(-2)**999999"), float('-inf'))
+        self.assertEqual(self.engine.evaluate_template("#**#", (9, 9 ** 9)), float('inf'))
+        # an overflowed value is never used as an operand
+        for expr in ("(2**70000)*0", "2**70000-2**70000", "2**2**70000"):
+            with self.assertRaises(ExpressionError):
+                self.engine.evaluate(expr)
+        self.assertEqual(self.engine.evaluate("2.5**7.**7."), float('inf'))
+        self.assertEqual(self.engine.evaluate("2**100"), 2 ** 100)
+
+    def test_float_power_limits(self):
+        self.assertEqual(self.engine.evaluate("0.5**10**400"), 0.0)
+        self.assertEqual(self.engine.evaluate("1.0**10**400"), 1.0)
+        self.assertEqual(self.engine.evaluate("2**-(10**400)"), 0.0)
+        self.assertEqual(self.engine.evaluate("(-1.0)**(10**400+1)"), -1.0)
+        self.assertEqual(self.engine.evaluate("0.5**-(10**400)"), float('inf'))
+        with self.assertRaises(ZeroDivisionError):
+            self.engine.evaluate("0.0**-(10**400)")
+
+    def test_huge_products_are_capped(self):
+        limits = EvalLimits(max_int_bits=64)
+        engine = ExpressionEngine(limits=limits)
+        self.assertEqual(engine.evaluate("-4294967296*4294967296"), float('-inf'))
+        with self.assertRaises(ExpressionError):
+            engine.evaluate("4294967296*4294967296*-2")
+        self.assertEqual(engine.evaluate("4294967296*2"), 8589934592)
+
+    def test_complexity_limits(self):
+        self.assertEqual(self.engine.evaluate("+".join(["1"] * 5000)), 5000)
+        with self.assertRaises(ExpressionError):
+            self.engine.evaluate("+".join(["1"] * 10002))
+        with self.assertRaises(ExpressionError):
+            self.engine.evaluate("(" * 60 + "1" + ")" * 60)
+
+class TestCalculatorEngine(unittest.TestCase):
+    def setUp(self):
+        self.calc = Calculator()
+
+    def test_calculate(self):
+        self.assertEqual(self.calc.calculate("12 × 3 + 4"), "40")
+        self.assertEqual(self.calc.calculate("10 ÷ 4"), "2.5")
+        self.assertEqual(self.calc.history[-1], "10 ÷ 4=2.5")
+
+    def test_errors(self):
+        with self.assertRaises(ValueError) as ctx:
+            self.calc.calculate("5/0")
+        self.assertEqual(str(ctx.exception), "Division by zero")
+        with self.assertRaises(ValueError):
+            self.calc.calculate("5+")
+
+    def test_astronomical_results_format_as_infinity(self):
+        self.assertEqual(self.calc.calculate("2**2000"), "∞")
+        self.assertEqual(self.calc.calculate("2**1024-1"), "∞")
+        self.assertEqual(self.calc.calculate("2**65536"), "∞")
+        self.assertEqual(self.calc.calculate("10**10**8"), "∞")
+        self.assertEqual(self.calc.calculate("-(9**9**9)"), "-∞")
+        with self.assertRaises(ValueError) as ctx:
+            self.calc.calculate("10**10**8-10**10**8")
+        self.assertEqual(str(ctx.exception), "Invalid expression: Result too large (over 65536 bits)")
+
+class TestExpressionBuffer(unittest.TestCase):
+    def type_keys(self, keys):
+        buffer = ExpressionBuffer()
+        for key in keys:
+            if key.isdigit():
+                buffer.push_digit(key)
+            elif key == '.':
+                buffer.push_decimal()
+            else:
+                buffer.push_operator(key)
+        return buffer
+
+    def test_keys_build_text_and_template(self):
+        buffer = self.type_keys("12.5×3.+-4")
+        self.assertEqual(buffer.text, "12.5×3.-4")
+        self.assertEqual(buffer.template(), ("#*#-#", (12.5, 3.0, 4)))
+        self.assertEqual(ExpressionEngine().evaluate_template(*buffer.template()), 33.5)
+
+    def test_decimal_and_sign_editing(self):
+        buffer = self.type_keys("5×3")
+        self.assertFalse(buffer.push_decimal() and buffer.push_decimal())
+        self.assertEqual(buffer.text, "5×3.")
+        buffer.backspace()
+        self.assertTrue(buffer.toggle_sign())
+        self.assertEqual(buffer.text, "5×-3")
+        buffer.toggle_sign()
+        self.assertEqual(buffer.text, "5×3")
+        buffer.backspace()
+        buffer.backspace()
+        self.assertEqual(buffer.text, "5")
+        self.assertFalse(buffer.decimal_added)
+
+    def test_set_text_accepts_formatted_results(self):
+        buffer = ExpressionBuffer("-1.2e+20")
+        self.assertEqual(buffer.template(), ("-#", (1.2e20,)))
+        buffer.push_operator('÷')
+        buffer.push_digit('2')
+        self.assertEqual(buffer.text, "-1.2e+20÷2")
+        self.assertTrue(buffer.complete)
+
+    def test_preview_matches_engine(self):
+        engine = ExpressionEngine()
+        buffer = ExpressionBuffer()
+        for keys in ["7", "+", "2", "×", "3", "÷", "4", "-", "1", ".", "5"]:
+            for key in keys:
+                if key.isdigit():
+                    buffer.push_digit(key)
+                elif key == '.':
+                    buffer.push_decimal()
+                else:
+                    buffer.push_operator(key)
+            expected = engine.evaluate(buffer.text.rstrip('+-×÷').replace('×', '*').replace('÷', '/'))
+            self.assertEqual(buffer.preview(), expected)
+        self.assertEqual(buffer.preview(), 7.0)
+        buffer.push_operator('÷')
+        buffer.push_digit('0')
+        self.assertIsNone(buffer.preview())
+        # a product past the int cap previews as infinity, like the engine's result
+        text = "×".join(["9" * 4000] * 5)
+        self.assertEqual(ExpressionBuffer(text).preview(), float('inf'))
+        self.assertIsNone(ExpressionBuffer(text + "+1").preview())
+
+    def test_long_text_loads_in_linear_time(self):
+        def load(terms):
+            text = "12+" * terms + "1"
+            best = float('inf')
+            for _ in range(3):
+                start = time.perf_counter()
+                buffer = ExpressionBuffer(text)
+                self.assertEqual(buffer.text, text)
+                best = min(best, time.perf_counter() - start)
+            return best
+        # 4x the input should cost about 4x the time, well short of the 16x of a quadratic copy
+        self.assertLess(load(40000), 8 * load(10000))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import math
+import os
+import tempfile
+import unittest
+import factorial as factorials
+from calculator import ScientificCalculator, perform_operation
+from history import CalculationHistory
+
+class TestFactorial(unittest.TestCase):
+    def test_matches_math_factorial(self):
+        table = factorials.FactorialTable(capacity=4)
+        for n in [0, 1, 20, 31, 32, 97, 1000, 1100, 5003, 5000]:
+            self.assertEqual(table.factorial(n), math.factorial(n))
+        self.assertLessEqual(len(table.checkpoints), 4)
+
+    def test_log_factorial_and_binomial(self):
+        self.assertAlmostEqual(factorials.log_factorial(1000), math.log(math.factorial(1000)))
+        self.assertAlmostEqual(factorials.log_binomial(50, 20), math.log(math.comb(50, 20)))
+        self.assertEqual(factorials.log_binomial(5, 6), -math.inf)
+        self.assertEqual(factorials.binomial(10, 3), 120)
+
+    def test_logs_past_the_float_range(self):
+        calc = ScientificCalculator()
+        self.assertEqual(calc.log_factorial(10 ** 400).error, "Log-factorial too large for a float")
+        self.assertEqual(perform_operation(calc, "lnfact", [10 ** 400]).error,
+                         "Log-factorial too large for a float")
+        self.assertAlmostEqual(calc.binomial(10 ** 400, 2, log=True).value,
+                               math.log(10 ** 400 * (10 ** 400 - 1) // 2))
+        self.assertTrue(calc.binomial(10 ** 400, 10 ** 200, log=True).error)
+
+    def test_calculator_large_factorial_and_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.jsonl")
+            calc = ScientificCalculator(history_path=path)
+            result = calc.factorial(5000)
+            self.assertEqual(result.value, math.factorial(5000))
+            self.assertIn("max 100000!", calc.factorial(100001).error)
+            self.assertEqual(calc.binomial(10, 3).expression, "binom(10, 3)")
+            calc.history.close()
+            reopened = CalculationHistory.open(path)
+            self.assertEqual(reopened.records[0].result, math.factorial(5000))
+            reopened.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import math
+import unittest
+from array import array
+import formatting
+import utils
+from core import Calculator, format_result
+
+DISPLAY_CASES = [
+    (0, "0"), (0.0, "0"), (-0.0, "0"), (42, "42"), (-7.0, "-7"), (2.5, "2.5"),
+    (1 / 3, "0.3333333333"), (0.1 + 0.2, "0.3"), (1e15, "1000000000000000"),
+    (10 ** 15 + 1, "1e+15"), (1.5e15, "1.5e+15"), (1e-10, "0.0000000001"),
+    (1.5e-11, "1.5e-11"), (-2.5e-12, "-2.5e-12"), (1e-11 - 1e-11, "0"),
+    (math.inf, "∞"), (-math.inf, "-∞"), (math.nan, "NaN"),
+    (10 ** 400, "∞"), (-10 ** 400, "-∞"), (2 ** 1024 - 1, "∞"), (1 - 2 ** 1024, "-∞"),
+    (2 ** 1023, "8.9884657e+307"), (True, "1"), (123456.789, "123456.789"),
+]
+
+class TestFormatting(unittest.TestCase):
+    def test_display_rules(self):
+        for value, expected in DISPLAY_CASES:
+            self.assertEqual(formatting.format_number(value), expected, value)
+            self.assertEqual(Calculator(keep_history=False)._format_number(value), expected, value)
+
+    def test_bulk_matches_scalar(self):
+        values = [value for value, _ in DISPLAY_CASES] * 3 + ["x", None]
+        expected = [formatting.format_number(v) if isinstance(v, (int, float)) else str(v)
+                    for v in values]
+        self.assertEqual(formatting.format_numbers(values), expected)
+        floats = array('d', [0.5, 2.0, 1e-12, math.inf])
+        self.assertEqual(formatting.format_numbers(floats), ["0.5", "2", "1e-12", "∞"])
+
+    def test_cache_does_not_change_output(self):
+        formatting.clear_cache()
+        for _ in range(2):
+            self.assertEqual(formatting.format_number(2.125), "2.125")
+        for i in range(formatting.CACHE_SIZE + 10):
+            formatting.format_number(i + 0.5)
+        self.assertLessEqual(len(formatting._fixed_cache), formatting.CACHE_SIZE)
+
+    def test_result_and_plain_styles(self):
+        self.assertEqual(format_result("2.50"), "2.5")
+        self.assertEqual(format_result(4.0), "4")
+        self.assertEqual(format_result(1.5e13 + 0.5), "1.50e+13")
+        self.assertEqual(format_result(1 / 3), "0.3333333333")
+        self.assertEqual(format_result("abc"), "abc")
+        self.assertEqual(utils.format_result(3.0), "3")
+        self.assertEqual(utils.format_result(0.1), "0.1")
+        self.assertEqual(utils.format_result(7), "7")
+
+if __name__ == '__main__':
+    unittest.main()
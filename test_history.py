@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import unittest
+from calculator import ScientificCalculator
+from history import CalculationHistory, ExpressionLog
+from history_log import HistoryLog
+from history_query import scan
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class TestCalculationHistory(unittest.TestCase):
+    def test_records_stay_compatible(self):
+        calc = ScientificCalculator()
+        calc.square_root(16)
+        calc.power(2, 0.5)
+        calc.logarithm(100)
+        calc.sine(30)
+        calc.factorial(20)
+        calc.get_constant('pi')
+        records = calc.history.records
+        self.assertEqual([r["expression"] for r in records],
+                         ["√16", "2^0.5", "log_10(100)", "sin(30°)", "20!", "constant(pi)"])
+        self.assertEqual(records[0]["operands"], [16])
+        self.assertIsInstance(records[0]["operands"][0], int)
+        self.assertEqual(records[4]["result"], 2432902008176640000)
+        self.assertEqual(records[-1].operation, 'const')
+
+    def test_records_are_plain_dicts_to_readers(self):
+        calc = ScientificCalculator()
+        calc.square_root(4)
+        calc.power(2, 10)
+        records = calc.history.records
+        self.assertEqual(records[0], {"expression": "√4", "result": 2.0, "operation": "√", "operands": [4]})
+        self.assertEqual(set(dict(records[1])), {"expression", "result", "operation", "operands"})
+        self.assertIsInstance(records[1].timestamp, float)
+        self.assertEqual(json.loads(json.dumps(records[:])), records[:])
+
+    def test_ring_buffer_evicts_oldest(self):
+        history = CalculationHistory(capacity=3)
+        for i in range(5):
+            history.add_calculation(None, i * 2, '√', [i])
+        self.assertEqual(len(history), 3)
+        self.assertEqual([r.result for r in history.records], [4, 6, 8])
+        self.assertEqual(history.records[0].seq, 2)
+        history.add_calculation("custom", "text", 'note', ["a", "b", "c"])
+        self.assertEqual(history.records[-1].expression, "custom")
+        self.assertEqual(history.records[-1].operands, ["a", "b", "c"])
+        history.clear()
+        self.assertEqual(len(history.records), 0)
+
+class TestHistoryQuery(unittest.TestCase):
+    def test_indexed_query_matches_scan(self):
+        history = CalculationHistory(capacity=50)
+        for i in range(80):
+            operation = 'log' if i % 3 == 0 else 'sin'
+            history.add_calculation(None, (i * 7) % 10 / 2, operation, [i, 10] if operation == 'log' else [i],
+                                    timestamp=1000.0 + i)
+            if i % 20 == 0:
+                history.query(operation='sin')
+        criteria = [dict(operation='log', result_range=(2, 3)),
+                    dict(result_range=(1, 1.5), since=1050.0),
+                    dict(since=1060.0, until=1065.0),
+                    dict(prefix='sin(4'),
+                    dict()]
+        for c in criteria:
+            self.assertEqual([r.seq for r in history.query(**c)],
+                             [r.seq for r in scan(history, **c)])
+        self.assertTrue(all(r.seq >= 30 for r in history.query(operation='log')))
+
+class TestHistoryLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "history.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reopen_loads_tail(self):
+        calc = ScientificCalculator(history_path=self.path)
+        for i in range(10):
+            calc.square_root(i)
+        calc.history.close()
+        reopened = CalculationHistory.open(self.path, capacity=4)
+        self.assertEqual([r.expression for r in reopened.records], ["√6", "√7", "√8", "√9"])
+        self.assertEqual(len(reopened.log), 10)
+        self.assertEqual(reopened.log[0]["operands"], [0])
+        reopened.close()
+
+    def test_records_reach_the_file_without_close(self):
+        calc = ScientificCalculator(history_path=self.path)
+        for i in range(10):
+            calc.square_root(i)
+        reopened = CalculationHistory.open(self.path)
+        self.assertEqual(len(reopened.records), 10)
+        self.assertEqual(reopened.records[-1].expression, "√9")
+        reopened.close()
+        calc.close()
+
+    def test_calculator_compacts_its_log(self):
+        calc = ScientificCalculator(history_path=self.path, history_max_records=3)
+        for i in range(8):
+            calc.square_root(i)
+        calc.close()
+        with HistoryLog(self.path) as log:
+            self.assertLessEqual(len(log), 6)
+            self.assertEqual(log[-1]["operands"], [7])
+
+    def test_torn_tail_is_truncated(self):
+        with HistoryLog(self.path) as log:
+            log.append(1.0, None, 2.0, '√', [4])
+            log.append(2.0, None, 3.0, '√', [9])
+        with open(self.path, "ab") as f:
+            f.write(b'{"timestamp":3.0,"res')
+        with HistoryLog(self.path) as log:
+            self.assertEqual(len(log), 2)
+            log.append(3.0, None, 4.0, '√', [16])
+            self.assertEqual(log[-1]["result"], 4.0)
+
+    def test_compaction_keeps_newest(self):
+        with HistoryLog(self.path, max_records=5) as log:
+            for i in range(11):
+                log.append(float(i), None, i, '√', [i * i])
+            self.assertEqual(len(log), 5)
+            self.assertEqual([r["result"] for r in log], [6, 7, 8, 9, 10])
+
+    def test_import_legacy_json(self):
+        with HistoryLog(self.path) as log:
+            self.assertEqual(log.import_json(os.path.join(BASE_DIR, "calc_history.json")), 2)
+            self.assertEqual([r["expression"] for r in log], ["25 + 37", "144 ÷ 12"])
+
+class TestExpressionLog(unittest.TestCase):
+    def test_bounded_and_rendered_on_read(self):
+        log = ExpressionLog(capacity=2)
+        log.add("1+1", "2")
+        log.append("raw=3")
+        log.add("2×2", "4")
+        self.assertEqual(list(log), ["raw=3", "2×2=4"])
+        self.assertEqual(log[-20:], ["raw=3", "2×2=4"])
+        self.assertEqual(log[-1], "2×2=4")
+
+if __name__ == '__main__':
+    unittest.main()
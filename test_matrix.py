@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+import matrix
+from array import array
+from calculator import ScientificCalculator, perform_operation
+from server import evaluate_lines
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestMatrixOperations(unittest.TestCase):
+    def setUp(self):
+        self.calc = ScientificCalculator()
+
+    def test_registered_operations(self):
+        self.assertEqual(perform_operation(self.calc, "dot", [[1, 2, 3], [4, 5, 6]]).value, 32.0)
+        self.assertAlmostEqual(perform_operation(self.calc, "det", [[[1, 2], [3, 4]]]).value, -2.0)
+        product = perform_operation(self.calc, "matmul", [[[1, 2], [3, 4]], [[0, 1], [1, 0]]])
+        self.assertEqual(product.value.tolist(), [[2.0, 1.0], [4.0, 3.0]])
+        inverse = perform_operation(self.calc, "inv", [[[2, 0], [0, 4]]])
+        self.assertEqual(inverse.value.tolist(), [[0.5, 0.0], [0.0, 0.25]])
+        solution = perform_operation(self.calc, "solve", [[[3, 1], [1, 2]], [9, 8]])
+        self.assertTrue(np.allclose(solution.value, [2, 3]))
+        self.assertEqual(perform_operation(self.calc, "inv", []).error, "inv requires exactly 1 operand")
+
+    def test_errors(self):
+        self.assertEqual(self.calc.inverse([[1, 2], [2, 4]]).error, "Matrix is singular")
+        self.assertEqual(self.calc.determinant([[1, 2, 3]]).error,
+                         "Determinant requires a square matrix, got 1×3")
+        self.assertEqual(self.calc.dot([1, 2], [1, 2, 3]).error, "Shapes 2 and 3 are not aligned")
+        self.assertEqual(self.calc.matmul([["a"]], [1]).error, "Matrix operands must be numeric")
+        self.assertEqual(len(self.calc.history.records), 0)
+
+    def test_history_keeps_shapes_only(self):
+        a = np.eye(300)
+        self.calc.matmul(a, a)
+        self.calc.determinant(a)
+        records = self.calc.history.records
+        self.assertEqual(records[0].expression, "matmul(300×300, 300×300)")
+        self.assertEqual(records[0].result, "300×300")
+        self.assertEqual((records[1].expression, records[1].result), ("det(300×300)", 1.0))
+
+    def test_buffers_and_npy_files(self):
+        vector = array('d', [1.0, 2.0])
+        self.assertEqual(self.calc.dot(vector, vector).value, 5.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a.npy")
+            np.save(path, np.array([[4.0, 0.0], [0.0, 2.0]]))
+            result = self.calc.solve(path, [8, 2])
+            self.assertEqual(result.value.tolist(), [2.0, 1.0])
+            self.assertEqual(result.expression, "solve(2×2, 2)")
+            missing = perform_operation(self.calc, "inv", [os.path.join(tmp, "missing.npy")])
+            self.assertTrue(missing.error.startswith("Cannot read matrix file"))
+            self.assertEqual(self.calc.determinant(os.path.join(tmp, "a.txt")).error,
+                             f"Unsupported matrix file: {os.path.join(tmp, 'a.txt')}")
+
+    def test_server_sends_matrices_as_lists(self):
+        requests = [{"id": 1, "op": "matmul", "args": [np.eye(40).tolist(), np.ones((40, 2)).tolist()]},
+                    {"id": 2, "op": "det", "args": [[[2, 0], [0, 3]]]}]
+        replies = [json.loads(line) for line in evaluate_lines([json.dumps(r) for r in requests])]
+        self.assertEqual(replies[0]["result"], [[1.0, 1.0]] * 40)
+        self.assertAlmostEqual(replies[1]["result"], 6.0)
+
+    def test_server_refuses_file_operands(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a.npy")
+            np.save(path, np.eye(2))
+            requests = [{"id": 1, "op": "det", "args": [path]},
+                        {"id": 2, "op": "solve", "args": [[[1, 0], [0, 1]], path]}]
+            replies = [json.loads(line) for line in evaluate_lines([json.dumps(r) for r in requests])]
+        self.assertEqual([r["error"] for r in replies], ["Matrix operands must be numeric"] * 2)
+        with self.assertRaises(ValueError):
+            matrix.as_operand(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import math
+import unittest
+from cache import LRUCache
+from calculator import ScientificCalculator
+from memo import MemoPolicy
+
+class TestMemoization(unittest.TestCase):
+    def test_cached_calls_still_record_history(self):
+        calc = ScientificCalculator()
+        first = calc.sine(30)
+        second = calc.sine(30)
+        self.assertEqual(first.value, second.value)
+        self.assertEqual(second.expression, "sin(30°)")
+        self.assertEqual(len(calc.history.records), 2)
+        stats = calc.memo_stats()["sine"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertTrue(math.copysign(1, calc.sine(-0.0).value) < 0)
+        self.assertTrue(calc.square_root(-1).error)
+
+    def test_rounded_keys_and_capacity(self):
+        calc = ScientificCalculator(memo_policies={'cosine': MemoPolicy(capacity=2, round_digits=3)})
+        calc.cosine(60.0001)
+        self.assertEqual(calc.cosine(60.0002).operands, [60.0002])
+        calc.cosine(10.0)
+        calc.cosine(20.0)
+        calc.power(2, 3)
+        stats = calc.memo_stats()
+        self.assertEqual(list(stats), ['cosine'])
+        self.assertEqual(stats['cosine']["hits"], 1)
+        self.assertEqual(stats['cosine']["evictions"], 1)
+        self.assertIsNone(ScientificCalculator(memo_policies=None).memo)
+
+    def test_ttl_expires_entries(self):
+        now = [0.0]
+        cache = LRUCache(4, ttl=10, clock=lambda: now[0])
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        now[0] = 10.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
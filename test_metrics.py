@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import metrics
+from calculator import ScientificCalculator, perform_operation
+from core import Calculator
+from main import main
+from worker import EvaluationWorker
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.REGISTRY.reset()
+        metrics.REGISTRY.enable()
+
+    def tearDown(self):
+        metrics.REGISTRY.disable()
+        metrics.REGISTRY.reset()
+
+    def entries(self):
+        snapshot = metrics.REGISTRY.snapshot()
+        calls = {(e["operation"], e["path"]): e["calls"] for e in snapshot["operations"]}
+        errors = {(e["operation"], e["error"]): e["count"] for e in snapshot["errors"]}
+        return calls, errors
+
+    def test_calculate_paths_and_error_classes(self):
+        calc = Calculator(keep_history=False)
+        calc.calculate("42")
+        calc.calculate("2+3")
+        calc.calculate("2+3")
+        for expression in ("1/0", "2+*"):
+            with self.assertRaises(ValueError):
+                calc.calculate(expression)
+        calls, errors = self.entries()
+        self.assertEqual(calls[("calculate", "simple")], 1)
+        self.assertEqual(calls[("calculate", "full")], 4)
+        self.assertEqual(errors, {("calculate", "Division by zero"): 1,
+                                  ("calculate", "Invalid expression"): 1})
+
+    def test_scientific_operations_count_errors(self):
+        calc = ScientificCalculator()
+        calc.square_root(9)
+        calc.square_root(-1)
+        perform_operation(calc, "sin", [30])
+        calls, errors = self.entries()
+        self.assertEqual(calls[("sqrt", "call")], 2)
+        self.assertEqual(calls[("sin", "perform_operation")], 1)
+        self.assertEqual(errors, {("sqrt", "Square root of negative number"): 1})
+
+    def test_disabled_registry_records_nothing(self):
+        metrics.REGISTRY.disable()
+        Calculator(keep_history=False).calculate("1+1")
+        ScientificCalculator().cosine(0)
+        self.assertEqual(self.entries(), ({}, {}))
+
+    def test_gui_worker_evaluations_are_recorded(self):
+        worker = EvaluationWorker(time_budget=10)
+        try:
+            for job in ("2*3", "1/0", ("#+#", (1, 2))):
+                worker.submit(job)
+                while worker.poll() is None:
+                    time.sleep(0.01)
+        finally:
+            worker.close()
+        calls, errors = self.entries()
+        self.assertEqual(calls[("calculate", "worker")], 3)
+        self.assertEqual(errors, {("calculate", "Division by zero"): 1})
+
+    def test_threads_are_merged_in_snapshots(self):
+        def work():
+            for _ in range(500):
+                metrics.REGISTRY.record("op", "call", 1000)
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        entry = metrics.REGISTRY.snapshot()["operations"][0]
+        self.assertEqual(entry["calls"], 2000)
+        self.assertEqual(entry["p50_ns"], 1024)
+
+    def test_prometheus_export(self):
+        metrics.REGISTRY.record("calculate", "full", 300)
+        metrics.REGISTRY.record("calculate", "full", 5000, 'Invalid expression: "x"')
+        text = metrics.REGISTRY.to_prometheus()
+        self.assertIn('calculator_calls_total{operation="calculate",path="full"} 2', text)
+        self.assertIn('calculator_errors_total{operation="calculate",error="Invalid expression"} 1', text)
+        self.assertIn('calculator_latency_seconds_bucket{operation="calculate",path="full",le="5.12e-07"} 1', text)
+        self.assertIn('calculator_latency_seconds_bucket{operation="calculate",path="full",le="+Inf"} 2', text)
+        self.assertIn('calculator_latency_seconds_count{operation="calculate",path="full"} 2', text)
+
+    def test_batch_writes_metrics_file(self):
+        metrics.REGISTRY.disable()
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "in.txt")
+            target = os.path.join(tmp, "stats.json")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("1+2\n3×4\n5÷0\n")
+            main(["--batch", source, "-o", os.path.join(tmp, "out.txt"), "--metrics-out", target])
+            with open(target, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        self.assertEqual(sum(e["calls"] for e in snapshot["operations"]), 3)
+        self.assertEqual(snapshot["errors"][0]["error"], "Division by zero")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from calculator import (BasicCalculator, CalculationResult, OPERATIONS, ScientificCalculator,
+                        perform_operation, perform_operations, register_operation)
+
+class TestOperationRegistry(unittest.TestCase):
+    def setUp(self):
+        self.calc = ScientificCalculator()
+
+    def test_builtin_operations_dispatch(self):
+        self.assertEqual(perform_operation(self.calc, 'sqrt', [16]).value, 4.0)
+        self.assertEqual(perform_operation(self.calc, 'log', [100]).value, 2.0)
+        self.assertEqual(perform_operation(self.calc, 'fact', ['5']).value, 120)
+        self.assertEqual(perform_operation(self.calc, 'sin', [1, 2]).error,
+                         "sin requires exactly 1 operand")
+        self.assertEqual(perform_operation(self.calc, 'log', [1, 2, 3]).error,
+                         "log requires 1 or 2 operands")
+        self.assertEqual(perform_operation(self.calc, 'fact', ['x']).error,
+                         "Factorial requires a valid integer input")
+        self.assertEqual(perform_operation(BasicCalculator(), 'sqrt', [4]).error,
+                         "Operation sqrt not supported")
+
+    def test_batch_matches_single_calls(self):
+        requests = [('sqrt', [4]), ('sin', [30]), ('sqrt', [-1]), ('nope', []),
+                    ('sqrt', [2.25]), ('log', [8, 2])]
+        batch = perform_operations(self.calc, requests)
+        single = [perform_operation(ScientificCalculator(), op, args) for op, args in requests]
+        self.assertEqual([(r.value, r.error, r.expression) for r in batch],
+                         [(r.value, r.error, r.expression) for r in single])
+        self.assertEqual(len(self.calc.history.records), 4)
+
+    def test_register_plugin_operation(self):
+        register_operation('double', lambda calc, x: CalculationResult(2 * x, 'double', [x]))
+        try:
+            self.assertEqual(perform_operation(BasicCalculator(), 'double', [21]).value, 42)
+            self.assertEqual(perform_operations(self.calc, [('double', [1])])[0].value, 2)
+        finally:
+            del OPERATIONS['double']
+
+if __name__ == '__main__':
+    unittest.main()
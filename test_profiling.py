@@ -0,0 +1,63 @@
+import os
+import pstats
+import tempfile
+import time
+import unittest
+import profiling
+from calculator import ScientificCalculator, perform_operation
+from core import Calculator
+from main import main
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        if profiling.PROFILER.active:
+            profiling.PROFILER.stop()
+
+    def test_sampled_stacks_are_tagged_with_the_shape(self):
+        calc = Calculator(keep_history=False)
+        profiling.PROFILER.start("sample", interval=0.001)
+        deadline = time.perf_counter() + 0.3
+        while time.perf_counter() < deadline:
+            calc.calculate("12×3+4")
+            perform_operation(ScientificCalculator(), "sqrt", [16])
+        profiling.PROFILER.stop()
+        tags = {stack.split(";", 1)[0] for stack in profiling.PROFILER.samples}
+        self.assertIn("shape:#*#+#", tags)
+        self.assertIn("operation:sqrt", tags)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.collapsed")
+            profiling.PROFILER.write(path)
+            with open(path, encoding="utf-8") as f:
+                line = f.readline()
+        self.assertRegex(line, r"^\S.* \d+\n$")
+
+    def test_cprofile_writes_pstats(self):
+        calc = Calculator(keep_history=False)
+        profiling.PROFILER.start("cprofile")
+        for i in range(50):
+            calc.calculate(f"{i}+1")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = profiling.stop_and_write(os.path.join(tmp, "out.pstats"))
+            stats = pstats.Stats(path)
+        self.assertTrue(any(name == "_measured_calculate" for _, _, name in stats.stats))
+
+    def test_inactive_profiler_leaves_no_trace(self):
+        Calculator(keep_history=False).calculate("1+1")
+        self.assertFalse(profiling.PROFILER.active)
+        self.assertEqual(profiling.PROFILER._tags, {})
+        with self.assertRaises(ValueError):
+            profiling.PROFILER.start("perf")
+
+    def test_batch_cli_flag(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "in.txt")
+            target = os.path.join(tmp, "batch.pstats")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("1+2\n3×4\n")
+            main(["--batch", source, "-o", os.path.join(tmp, "out.txt"),
+                  "--profile", "cprofile", "--profile-out", target])
+            self.assertFalse(profiling.PROFILER.active)
+            self.assertGreater(len(pstats.Stats(target).stats), 0)
+
+if __name__ == '__main__':
+    unittest.main()
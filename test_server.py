@@ -0,0 +1,47 @@
+import asyncio
+import json
+import unittest
+from server import evaluate_lines, serve
+
+class TestEvaluationServer(unittest.TestCase):
+    def test_pipelined_requests(self):
+        async def scenario():
+            ready = asyncio.get_running_loop().create_future()
+            task = asyncio.create_task(serve(port=0, ready=ready.set_result))
+            listener = await ready
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            requests = [{"id": 1, "expr": "2+3×4"}, {"id": 2, "op": "sqrt", "args": [16]},
+                        {"id": 3, "expr": "1/0"}, {"id": 4, "op": "fact", "args": [3000]},
+                        {"id": 5, "op": "nope"}]
+            writer.write(b"".join(json.dumps(r).encode() + b"\n" for r in requests) + b"{bad\n")
+            await writer.drain()
+            replies = [json.loads(await reader.readline()) for _ in range(len(requests) + 1)]
+            writer.close()
+            task.cancel()
+            return replies
+
+        replies = asyncio.run(scenario())
+        self.assertEqual([r["id"] for r in replies], [1, 2, 3, 4, 5, None])
+        self.assertEqual(replies[0]["result"], 14)
+        self.assertEqual(replies[1]["result"], 4.0)
+        self.assertEqual(replies[2]["error"], "Division by zero")
+        self.assertIn("hex", replies[3]["result"])
+        self.assertEqual(replies[4]["error"], "Operation nope not supported")
+        self.assertEqual(replies[5]["error"], "Malformed request")
+
+    def test_failing_operation_only_fails_its_own_request(self):
+        requests = [{"id": 1, "op": "log", "args": ["x"]}, {"id": 2, "op": "log", "args": [100]},
+                    {"id": 3, "op": "fact", "args": [1e309]}, {"id": 4, "op": "fact", "args": [5]},
+                    {"id": 5, "op": "sqrt", "args": [9]}, {"id": 6, "expr": "2 + 3 × 4"}]
+        replies = [json.loads(line) for line in evaluate_lines([json.dumps(r) for r in requests])]
+        self.assertEqual([r["id"] for r in replies], [1, 2, 3, 4, 5, 6])
+        self.assertTrue(replies[0]["error"].startswith("Invalid operands for log"))
+        self.assertEqual(replies[1]["result"], 2.0)
+        self.assertTrue(replies[2]["error"].startswith("Invalid operands for fact"))
+        self.assertEqual(replies[3]["result"], 120)
+        self.assertEqual(replies[4]["result"], 3.0)
+        self.assertEqual(replies[5]["result"], 14)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import unittest
+from cache import LRUCache
+from session import SessionManager
+
+class TestSessions(unittest.TestCase):
+    def test_sessions_keep_separate_state(self):
+        manager = SessionManager()
+        first, second = manager.open("a"), manager.open("b")
+        first.memory_add("5")
+        self.assertEqual(first.calculate("2+3"), "5")
+        self.assertEqual(second.calculate("2+3"), "5")
+        with self.assertRaises(ValueError) as ctx:
+            second.calculate("1/0")
+        self.assertEqual(str(ctx.exception), "Division by zero")
+        self.assertEqual(first.memory_recall(), "5")
+        self.assertEqual(second.memory_recall(), "0")
+        self.assertEqual(first.history_snapshot(), ["2+3=5"])
+        self.assertIs(manager.open("a"), first)
+        self.assertEqual(manager.cache_stats()["results"]["hits"], 1)
+        self.assertTrue(manager.close("a"))
+        self.assertIsNone(manager.get("a"))
+
+    def test_concurrent_sessions_stress(self):
+        manager = SessionManager(stripes=4, cache_size=64, result_cache_size=32)
+        threads, rounds, sessions = 16, 400, 24
+        errors = []
+        start = threading.Barrier(threads)
+
+        def run(worker):
+            try:
+                start.wait()
+                for i in range(rounds):
+                    session = manager.open(f"s{(worker + i) % sessions}")
+                    a, b = i % 50, worker + 1
+                    self.assertEqual(session.calculate(f"{a}*{b}+{a}"), str(a * b + a))
+                    session.memory_add(1)
+            except Exception as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=run, args=(w,)) for w in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.assertEqual(errors, [])
+        total_memory = sum(float(manager.get(f"s{s}").memory_recall()) for s in range(sessions))
+        total_history = sum(len(manager.get(f"s{s}").history) for s in range(sessions))
+        self.assertEqual(total_memory, threads * rounds)
+        self.assertEqual(total_history, threads * rounds)
+        stats = manager.results.stats()
+        self.assertLessEqual(stats["size"], 32)
+        self.assertEqual(stats["hits"] + stats["misses"], threads * rounds)
+
+    def test_lru_cache_under_threads(self):
+        cache = LRUCache(8)
+
+        def churn(offset):
+            for i in range(5000):
+                cache.put((offset + i) % 20, i)
+                cache.get(i % 20)
+
+        workers = [threading.Thread(target=churn, args=(w,)) for w in range(8)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(len(cache), 8)
+        self.assertEqual(stats["hits"] + stats["misses"], 8 * 5000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import unittest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# cumulative import time budgets in microseconds, as reported by python -X importtime
+HEADLESS_BUDGET_US = 250_000
+GUI_BUDGET_US = 1_000_000
+
+def import_profile(module):
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+def best_import_time(module, runs=3):
+    return min(import_profile(module)[module] for _ in range(runs))
+
+class TestStartup(unittest.TestCase):
+    def test_headless_import_skips_tkinter(self):
+        modules = import_profile("main")
+        self.assertNotIn("tkinter", modules)
+        self.assertNotIn("multiprocessing", modules)
+        self.assertLess(best_import_time("main"), HEADLESS_BUDGET_US)
+
+    def test_gui_entry_point_budget(self):
+        try:
+            import tkinter  # noqa: F401
+        except ImportError:
+            self.skipTest("tkinter is not available")
+        self.assertIn("tkinter", import_profile("app"))
+        self.assertLess(best_import_time("app"), GUI_BUDGET_US)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import math
+import os
+import random
+import statistics
+import tempfile
+import unittest
+from array import array
+import streamstats
+from calculator import ScientificCalculator
+
+class TestStreamStats(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.data = [rng.lognormvariate(0, 1) * rng.choice((1, -1)) for _ in range(20000)] + [0.0] * 50
+
+    def check(self, summary, data):
+        self.assertEqual(summary.count, len(data))
+        self.assertAlmostEqual(summary.mean, statistics.fmean(data), places=12)
+        self.assertAlmostEqual(summary.variance(), statistics.variance(data), places=9)
+        self.assertEqual((summary.minimum, summary.maximum), (min(data), max(data)))
+        ordered = sorted(data)
+        for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+            exact = ordered[round(q * (len(data) - 1))]
+            self.assertLessEqual(abs(summary.quantile(q) - exact), 0.011 * abs(exact), q)
+
+    def test_welford_and_quantiles(self):
+        self.check(streamstats.summarize(iter(self.data)), self.data)
+        single = streamstats.StreamSummary()
+        for x in self.data[:500]:
+            single.add(x)
+        self.check(single, self.data[:500])
+
+    def test_pure_python_path(self):
+        numpy = streamstats.np
+        streamstats.np = None
+        try:
+            self.check(streamstats.summarize(self.data), self.data)
+        finally:
+            streamstats.np = numpy
+
+    def test_partial_summaries_merge(self):
+        parts = [streamstats.summarize(self.data[i::3]) for i in range(3)]
+        merged = parts[0].merge(parts[1]).merge(parts[2])
+        self.check(merged, self.data)
+
+    def test_non_finite_values_are_skipped(self):
+        summary = streamstats.summarize([1, math.nan, 3, math.inf])
+        self.assertEqual((summary.count, summary.skipped, summary.mean), (2, 2, 2.0))
+        empty = streamstats.summarize([]).as_dict()
+        self.assertEqual(empty["count"], 0)
+        self.assertTrue(math.isnan(empty["mean"]) and math.isnan(empty["quantiles"][0.5]))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            binary = os.path.join(tmp, "values.f64")
+            with open(binary, "wb") as f:
+                array('d', self.data * 4).tofile(f)
+            text = os.path.join(tmp, "values.txt")
+            with open(text, "w", encoding="utf-8") as f:
+                f.write("\n".join(f"{x!r}, {x!r}" for x in self.data[:100]))
+            # more values than one chunk, so two workers each take a range
+            self.check(streamstats.summarize_file(binary, binary=True), self.data * 4)
+            self.check(streamstats.summarize_file(binary, binary=True, workers=2), self.data * 4)
+            self.check(streamstats.summarize_file(text), self.data[:100] * 2)
+
+    def test_calculator_records_one_summary_entry(self):
+        calc = ScientificCalculator()
+        summary = calc.statistics([2, 4, 4, 4, 5, 5, 7, 9])
+        self.assertEqual(summary.stddev(sample=False), 2.0)
+        self.assertEqual(len(calc.history.records), 1)
+        record = calc.history.records[0]
+        self.assertEqual(record.result, 5.0)
+        self.assertTrue(record.expression.startswith("stats[8 values] mean=5 "))
+
+if __name__ == '__main__':
+    unittest.main()
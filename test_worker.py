@@ -0,0 +1,67 @@
+import time
+import unittest
+from worker import EvaluationWorker
+
+class TestEvaluationWorker(unittest.TestCase):
+    def setUp(self):
+        self.worker = EvaluationWorker(time_budget=30)
+
+    def tearDown(self):
+        self.worker.close()
+
+    def wait(self, worker=None):
+        worker = worker or self.worker
+        while True:
+            reply = worker.poll()
+            if reply is not None:
+                return reply
+            time.sleep(0.01)
+
+    def run_job(self, job):
+        self.worker.submit(job)
+        return self.wait()
+
+    def test_results_and_errors(self):
+        self.assertEqual(self.run_job("12*3+4"), ("ok", 40))
+        self.assertEqual(self.run_job(("#*#+#", (12, 3, 4))), ("ok", 40))
+        self.assertEqual(self.run_job("1/0"), ("error", "Division by zero"))
+        status, message = self.run_job("2+*")
+        self.assertEqual(status, "error")
+        self.assertTrue(message.startswith("Invalid expression"))
+        # runaway powers are capped by the evaluation limits instead of running out the budget
+        self.assertEqual(self.run_job("9**9**9"), ("ok", float('inf')))
+        self.assertEqual(self.run_job("9**9**9*0"),
+                         ("error", "Invalid expression: Result too large (over 65536 bits)"))
+
+    def test_one_job_at_a_time(self):
+        self.worker.submit("1+1")
+        with self.assertRaises(RuntimeError):
+            self.worker.submit("2+2")
+        self.assertEqual(self.wait(), ("ok", 2))
+        self.assertFalse(self.worker.busy)
+
+    def test_timeout_replaces_the_process(self):
+        # a fresh worker process needs far longer than 1ms to start and answer
+        worker = EvaluationWorker(time_budget=0.001)
+        try:
+            worker.submit("1+1")
+            status, message = self.wait(worker)
+            self.assertEqual(status, "timeout")
+            self.assertEqual(message, "Calculation exceeded 0.001s and was stopped")
+            self.assertIsNone(worker._process)
+            worker.time_budget = 30
+            worker.submit("2+2")
+            self.assertEqual(self.wait(worker), ("ok", 4))
+        finally:
+            worker.close()
+
+    def test_cancel(self):
+        self.assertFalse(self.worker.cancel())
+        self.worker.submit("3*3")
+        self.assertTrue(self.worker.cancel())
+        self.assertFalse(self.worker.busy)
+        self.assertIsNone(self.worker.poll())
+        self.assertEqual(self.run_job("3*3"), ("ok", 9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,14 @@
 import re
 from typing import Union
 
+from formatting import format_plain
+
 def validate_numeric_input(value: str) -> bool:
     pattern = r'^-?\d*\.?\d+$'
     return bool(re.match(pattern, value))
 
 def format_result(value: Union[int, float]) -> str:
-    if isinstance(value, float) and value.is_integer():
-        return str(int(value))
-    return str(value)
+    return format_plain(value)
 
 def parse_input(value: str) -> Union[int, float]:
     if not validate_numeric_input(value):
@@ -0,0 +1,124 @@
+import multiprocessing
+import time
+
+import metrics
+from expression import ExpressionEngine
+
+
+def _serve(conn, cache_size):
+    engine = ExpressionEngine(cache_size)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        job_id, expression = message
+        try:
+            if isinstance(expression, tuple):
+                value = engine.evaluate_template(*expression)
+            else:
+                value = engine.evaluate(expression)
+            reply = (job_id, "ok", value)
+        except ZeroDivisionError:
+            reply = (job_id, "error", "Division by zero")
+        except Exception as e:
+            reply = (job_id, "error", f"Invalid expression: {str(e)}")
+        conn.send(reply)
+
+
+class EvaluationWorker:
+    def __init__(self, time_budget=5.0, cache_size=256):
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._job_id = 0
+        self._job = None
+
+    def start(self):
+        if self._process is not None and self._process.is_alive():
+            return
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(target=_serve, args=(child_conn, self.cache_size),
+                                              daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    @property
+    def busy(self):
+        return self._job is not None
+
+    def submit(self, expression):
+        if self.busy:
+            raise RuntimeError("A calculation is already running")
+        self.start()
+        self._job_id += 1
+        self._job = (self._job_id, time.monotonic())
+        self._conn.send((self._job_id, expression))
+        return self._job_id
+
+    def poll(self):
+        if self._job is None:
+            return None
+        job_id, started = self._job
+        try:
+            while self._conn.poll():
+                reply = self._conn.recv()
+                if reply[0] == job_id:
+                    self._job = None
+                    return self._finish(started, reply[1], reply[2])
+        except (EOFError, OSError):
+            self._stop_process()
+            self._job = None
+            return self._finish(started, "error", "Calculation worker stopped unexpectedly")
+        if self.time_budget is not None and time.monotonic() - started > self.time_budget:
+            # a runaway computation cannot be interrupted in place, so the process is replaced
+            self.cancel()
+            return self._finish(started, "timeout",
+                                f"Calculation exceeded {self.time_budget:g}s and was stopped")
+        if not self._process.is_alive():
+            self._stop_process()
+            self._job = None
+            return self._finish(started, "error", "Calculation worker stopped unexpectedly")
+        return None
+
+    def _finish(self, started, status, value):
+        # GUI evaluations are timed here, from submit to reply, under the "worker" path
+        registry = metrics.REGISTRY
+        if registry.enabled:
+            error = None if status == "ok" else ("Timeout" if status == "timeout" else value)
+            registry.record("calculate", "worker", int((time.monotonic() - started) * 1e9), error)
+        return status, value
+
+    def cancel(self):
+        if self._job is None:
+            return False
+        self._job = None
+        self._stop_process()
+        return True
+
+    def _stop_process(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(timeout=1)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def close(self):
+        if self._conn is not None and self._job is None and self._process.is_alive():
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+            self._process.join(timeout=1)
+        self._job = None
+        self._stop_process()